@@ -2,6 +2,9 @@
 ASGI config for alx_backend_graphql_crm project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with e.g. ``uvicorn alx_backend_graphql_crm.asgi:application`` and
+send GraphQL traffic to ``/graphql/async/``, which executes requests on a
+bounded thread pool instead of a new thread per concurrent request.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
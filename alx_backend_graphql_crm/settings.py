@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,6 +56,82 @@ GRAPHENE = {
     "SCHEMA": "alx_backend_graphql_crm.schema.schema"  # points to schema.py
 }
 
+# Local memory cache for development and tests; point "default" at a shared
+# backend (Redis, memcached) in production so workers share cached responses.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Read-only query results, invalidated per model on writes (crm/response_cache.py)
+GRAPHQL_RESPONSE_CACHE = {
+    "ENABLED": True,
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+}
+
+# Parsed + validated documents kept in memory per process (crm/documents.py)
+GRAPHQL_DOCUMENT_CACHE_SIZE = 256
+# Cache alias holding the persisted query registry; use a shared backend
+# (e.g. Redis) in production so all workers see registered hashes.
+GRAPHQL_PERSISTED_QUERY_CACHE = "default"
+# Per-operation budget checked before execution (crm/complexity.py). Cost is
+# roughly the number of objects a query can return: connections multiply by
+# first/last (or the 100-row page limit).
+GRAPHQL_QUERY_COST = {
+    "MAX_COST": 25_000,
+    "MAX_DEPTH": 8,
+    "FIELD_WEIGHTS": {
+        "Query.crmStats": 10,  # up to three aggregate queries
+        "Query.search": 10,  # index lookups per kind, then one query per kind
+    },
+}
+# Per-resolver timing and SQL counts (crm/instrumentation.py), scraped from
+# /metrics/; requests sending the debug header also get them in extensions.
+GRAPHQL_INSTRUMENTATION = {
+    "ENABLED": True,
+    "DEBUG_HEADER": "X-GraphQL-Debug",
+}
+# Product/customer search (crm/search.py): FTS5 tables on SQLite, a token table
+# elsewhere. FILTERS routes the name/email filters through the index (word
+# prefix matches) instead of icontains scans.
+CRM_SEARCH = {
+    "BACKEND": "auto",
+    "FILTERS": False,
+}
+# /graphql/export/<kind>/ streams filtered rows as CSV/NDJSON (crm/exports.py),
+# one keyset query of CHUNK_SIZE rows at a time.
+CRM_EXPORT = {
+    "CHUNK_SIZE": 2000,
+}
+# CSV product imports by sku (crm/product_import.py: manage.py import_products
+# and the importProducts upload mutation), one transaction per batch.
+CRM_PRODUCT_IMPORT = {
+    "BATCH_SIZE": 5000,
+    "MAX_REPORTED_REJECTS": 100,
+}
+# The CRM report task (crm/tasks.py) is a Celery chord: one task per
+# PARTITION_SIZE order ids, summed into LOG_FILE. Chords need a result backend.
+CRM_REPORT = {
+    "PARTITION_SIZE": int(os.environ.get("CRM_REPORT_PARTITION_SIZE", 100_000)),
+    "LOG_FILE": "/tmp/crm_report_log.txt",
+}
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+# POSTing a JSON array runs a batch of operations in one request (crm/batching.py);
+# with the atomic header the batch commits or rolls back as a whole.
+GRAPHQL_BATCH = {
+    "MAX_OPERATIONS": 100,
+    "ATOMIC_HEADER": "X-GraphQL-Batch-Atomic",
+}
+# Threads executing /graphql/async/ requests under ASGI (AsyncCRMGraphQLView);
+# each holds its own database connection.
+GRAPHQL_ASYNC_WORKERS = int(os.environ.get("GRAPHQL_ASYNC_WORKERS", 8))
+# Scheduled jobs run GraphQL in-process (crm/executor.py); set CRM_GRAPHQL_URL
+# to post to a remote /graphql/ when jobs run away from the database.
+GRAPHQL_EXECUTOR_URL = os.environ.get("CRM_GRAPHQL_URL")
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,11 +165,24 @@ WSGI_APPLICATION = 'alx_backend_graphql_crm.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Configured from the environment (alx_backend_graphql_crm/database.py):
+# DATABASE_URL picks SQLite (the default, BASE_DIR/db.sqlite3) or PostgreSQL;
+# DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS and DB_POOL* tune connection reuse.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_settings(default_sqlite=BASE_DIR / 'db.sqlite3'),
+}
+# A read replica (e.g. sqlite:///replica.sqlite3 locally, refreshed with
+# manage.py sync_sqlite_replica) serves GraphQL query operations, exports and
+# report jobs; writes and everything else use the primary (crm/db_routing.py).
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = database_settings(os.environ['DATABASE_REPLICA_URL'])
+DATABASE_ROUTERS = ['crm.db_routing.PrimaryReplicaRouter']
+# After a client mutates, its reads stick to the primary for STICKY_SECONDS
+# (cookie-based), which should cover the replica's lag.
+CRM_DB_ROUTING = {
+    'REPLICA': 'replica',
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 10)),
+    'COOKIE': 'crm_read_primary_until',
 }
 
 
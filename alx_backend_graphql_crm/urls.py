@@ -16,14 +16,20 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from graphene_django.views import GraphQLView
+from crm.views import AsyncCRMGraphQLView, CRMGraphQLView, cache_stats, export, prometheus_metrics
 from django.views.decorators.csrf import csrf_exempt
 
 from django.shortcuts import redirect
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("graphql/", csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path("graphql/", csrf_exempt(CRMGraphQLView.as_view(graphiql=True))),
+    # for ASGI servers (alx_backend_graphql_crm/asgi.py)
+    path("graphql/async/", csrf_exempt(AsyncCRMGraphQLView.as_view())),
+    path("graphql/stats/", cache_stats),
+    # streamed CSV/NDJSON extracts, filtered like allOrders/allCustomers/allProducts
+    path("graphql/export/<str:kind>/", export),
+    path("metrics/", prometheus_metrics),
     path("", lambda request: redirect("graphql/")),  # redirect root to graphql
 ]
 
@@ -0,0 +1,149 @@
+"""
+Load test: WSGI (gunicorn threads) vs. ASGI (uvicorn) /graphql/ and /graphql/async/.
+
+Starts each server against a seeded throwaway SQLite file and fires a mix of
+slow (a 20-order page with lines) and fast (``hello``) queries at a fixed
+concurrency, reporting requests/sec, p50/p99 latency per query kind and the
+peak number of server threads (each may hold a database connection).
+
+    python -m benchmarks.asgi_load --sizes 2000 --concurrency 32
+    python -m benchmarks.asgi_load --sql-latency 5   # database over a network
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--sizes", default="2000", help="total requests per target, comma separated")
+parser.add_argument("--concurrency", type=int, default=32)
+parser.add_argument("--workers", type=int, default=8, help="threads per server process")
+parser.add_argument("--sql-latency", type=float, default=0, help="ms added to every SQL query (network database)")
+args = parser.parse_args()
+
+SLOW = json.dumps({"query": """
+{ allOrders(first: 20) { edges { node { id totalAmount customer { email } lines { quantity unitPrice } } } } }
+"""}).encode()
+FAST = json.dumps({"query": "{ hello }"}).encode()
+
+tmp = tempfile.TemporaryDirectory()
+env = {
+    **os.environ,
+    "DJANGO_SETTINGS_MODULE": "benchmarks.server_settings",
+    "BENCH_DB": os.path.join(tmp.name, "bench.sqlite3"),
+    "GRAPHQL_ASYNC_WORKERS": str(args.workers),
+    "BENCH_SQL_LATENCY_MS": str(args.sql_latency),
+}
+
+
+def prepare_database():
+    os.environ.update({**env, "BENCH_SQL_LATENCY_MS": "0"})
+    import django
+    django.setup()
+    from django.core.management import call_command
+
+    from benchmarks.common import seed
+    call_command("migrate", verbosity=0)
+    seed(customers=500, products=100, orders=5000, lines_per_order=3)
+
+
+async def request(port, path, body):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = response.split(b" ", 2)[1]
+    if status != b"200":
+        raise RuntimeError(response[:500])
+
+
+def thread_count(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("Threads:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def load(port, path, total, pid):
+    latencies = {"slow": [], "fast": []}
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait("slow" if i % 4 == 0 else "fast")
+
+    async def worker():
+        while not queue.empty():
+            kind = queue.get_nowait()
+            start = time.perf_counter()
+            await request(port, path, SLOW if kind == "slow" else FAST)
+            latencies[kind].append(time.perf_counter() - start)
+
+    peak_threads = 0
+    workers = asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    start = time.perf_counter()
+    while not workers.done():
+        peak_threads = max(peak_threads, thread_count(pid))
+        await asyncio.sleep(0.05)
+    await workers
+    return total / (time.perf_counter() - start), latencies, peak_threads
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def serve(command, port):
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            asyncio.run(request(port, "/graphql/", FAST))
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"server on port {port} did not start: {command}")
+
+
+prepare_database()
+servers = {
+    "wsgi": (
+        [sys.executable, "-m", "gunicorn", "benchmarks.servers:wsgi_application",
+         "--bind", "127.0.0.1:8701", "--workers", "1", "--threads", str(args.workers)],
+        8701,
+    ),
+    "asgi": (
+        [sys.executable, "-m", "uvicorn", "benchmarks.servers:asgi_application",
+         "--port", "8702", "--workers", "1", "--no-access-log"],
+        8702,
+    ),
+}
+targets = [("wsgi", "/graphql/"), ("asgi", "/graphql/"), ("asgi", "/graphql/async/")]
+
+processes = {name: serve(command, port) for name, (command, port) in servers.items()}
+try:
+    for total in [int(size) for size in args.sizes.split(",")]:
+        for name, path in targets:
+            port = servers[name][1]
+            pid = processes[name].pid
+            asyncio.run(load(port, path, min(total, 200), pid))  # warm up
+            rps, latencies, threads = asyncio.run(load(port, path, total, pid))
+            print(
+                f"{name} {path:<16} {total} requests x{args.concurrency}  {rps:7.1f} req/s   "
+                f"hello p50 {percentile(latencies['fast'], 0.5):7.1f} ms p99 {percentile(latencies['fast'], 0.99):7.1f} ms   "
+                f"orders p50 {percentile(latencies['slow'], 0.5):7.1f} ms p99 {percentile(latencies['slow'], 0.99):7.1f} ms   "
+                f"threads {threads}"
+            )
+finally:
+    for process in processes.values():
+        process.terminate()
+        process.wait()
+    tmp.cleanup()
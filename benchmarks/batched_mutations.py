@@ -0,0 +1,76 @@
+"""
+createCustomer mutations over HTTP: one request each vs. batched arrays.
+
+Talks to a live server thread on an ephemeral port, as benchmarks.executor
+does (a fresh connection per request: keep-alive against the threaded dev
+server adds ~40 ms delayed-ACK stalls); batches of 100 are sent plain and
+with the atomic batch header.
+
+    python -m benchmarks.batched_mutations --sizes 1000
+"""
+from benchmarks.common import parse_sizes, setup, timed, truncate
+
+sizes = parse_sizes("1000", __doc__)
+setup()
+
+import requests  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test.testcases import LiveServerThread  # noqa: E402
+
+from crm.batching import batch_options  # noqa: E402
+from crm.models import Customer  # noqa: E402
+
+CREATE = """
+mutation ($name: String!, $email: String!) {
+  createCustomer(name: $name, email: $email) { customer { id } errors }
+}
+"""
+BATCH_SIZE = 100
+
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "localhost"]
+connections["default"].inc_thread_sharing()
+server = LiveServerThread("localhost", lambda handler: WSGIHandler(), connections_override={"default": connections["default"]})
+server.daemon = True
+server.start()
+server.is_ready.wait()
+if server.error:
+    raise server.error
+url = f"http://localhost:{server.port}/graphql/"
+
+
+def operations(count):
+    return [
+        {"id": i, "query": CREATE, "variables": {"name": f"Customer {i}", "email": f"customer{i}@example.com"}}
+        for i in range(count)
+    ]
+
+
+def individually(count):
+    for operation in operations(count):
+        requests.post(url, json=operation).raise_for_status()
+
+
+def batched(count, headers=None):
+    ops = operations(count)
+    for start in range(0, count, BATCH_SIZE):
+        requests.post(url, json=ops[start:start + BATCH_SIZE], headers=headers).raise_for_status()
+
+
+atomic = {batch_options()["ATOMIC_HEADER"]: "1"}
+for count in sizes:
+    results = []
+    for label, run in (
+        ("individual", individually),
+        (f"batches of {BATCH_SIZE}", batched),
+        (f"atomic batches of {BATCH_SIZE}", lambda count: batched(count, atomic)),
+    ):
+        truncate(Customer)
+        seconds, _ = timed(run, count)
+        assert Customer.objects.count() == count
+        results.append(seconds)
+        print(f"{label:<24} {count} mutations  {seconds:7.3f}s  {count / seconds:8,.0f} mutations/s")
+    print(f"speedup batched vs individual: {results[0] / results[1]:.1f}x")
+
+server.terminate()
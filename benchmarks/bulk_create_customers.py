@@ -0,0 +1,58 @@
+"""
+BulkCreateCustomers throughput: set-based bulk path vs. the old per-row loop.
+
+    python -m benchmarks.bulk_create_customers --sizes 1000,10000,100000
+"""
+from benchmarks.common import parse_sizes, report, setup, timed, truncate
+
+sizes = parse_sizes("1000,10000,100000", __doc__)
+setup()
+
+import json  # noqa: E402
+
+from django.core.exceptions import ValidationError  # noqa: E402
+from django.db import transaction  # noqa: E402
+
+from crm.models import Customer  # noqa: E402
+from crm.schema import BulkCreateCustomers, validate_phone  # noqa: E402
+
+
+@transaction.atomic
+def legacy_bulk_create(rows):
+    """The previous implementation: one exists(), full_clean() and save() per row."""
+    created, errors = [], []
+    for data in rows:
+        try:
+            data_dict = json.loads(data)
+            email = data_dict.get("email")
+            phone = data_dict.get("phone")
+            if Customer.objects.filter(email=email).exists():
+                raise ValidationError(f"Email already exists: {email}")
+            if phone and not validate_phone(phone):
+                raise ValidationError(f"Invalid phone format for {email}")
+            c = Customer(name=data_dict.get("name"), email=email, phone=phone)
+            c.full_clean()
+            c.save()
+            created.append(c)
+        except Exception as e:
+            errors.append(str(e))
+    return created, errors
+
+
+def make_rows(count):
+    return [
+        json.dumps({"name": f"Customer {i}", "email": f"customer{i}@example.com", "phone": "+1234567890"})
+        for i in range(count)
+    ]
+
+
+for size in sizes:
+    rows = make_rows(size)
+
+    truncate(Customer)
+    seconds, _ = timed(legacy_bulk_create, rows)
+    report("per-row loop", size, seconds)
+
+    truncate(Customer)
+    seconds, _ = timed(BulkCreateCustomers.mutate, None, None, rows)
+    report("bulk path", size, seconds)
@@ -0,0 +1,68 @@
+"""
+Importing orders: one bulkCreateOrders mutation vs. looping createOrder.
+
+Both run in-process through the project schema (crm.executor), each order
+taking two products with stock adjusted.
+
+    python -m benchmarks.bulk_create_orders --sizes 1000,10000
+"""
+from benchmarks.common import parse_sizes, report, seed, setup, timed, truncate
+
+sizes = parse_sizes("1000,10000", __doc__)
+setup()
+
+from django.db import connection  # noqa: E402
+
+from crm.executor import execute_local  # noqa: E402
+from crm.models import Customer, Order, OrderLine, Product  # noqa: E402
+
+CREATE = """
+mutation ($customerId: ID!, $productIds: [ID]) {
+  createOrder(customerId: $customerId, productIds: $productIds) { order { id } errors }
+}
+"""
+BULK_CREATE = """
+mutation ($input: [BulkOrderInput!]!) {
+  bulkCreateOrders(input: $input) { orders { id } errors }
+}
+"""
+
+seed(customers=1000, products=50)
+customer_ids = list(Customer.objects.values_list("pk", flat=True))
+product_ids = list(Product.objects.values_list("pk", flat=True))
+
+
+def entries(count):
+    return [
+        {"customerId": customer_ids[i % len(customer_ids)],
+         "productIds": [product_ids[i % len(product_ids)], product_ids[(i + 1) % len(product_ids)]]}
+        for i in range(count)
+    ]
+
+
+def counting(queries):
+    def wrapper(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+def loop(rows):
+    for row in rows:
+        assert not execute_local(CREATE, row)["createOrder"]["errors"]
+
+
+def bulk(rows):
+    assert not execute_local(BULK_CREATE, {"input": rows})["bulkCreateOrders"]["errors"]
+
+
+for size in sizes:
+    rows = entries(size)
+    for label, run in (("createOrder loop", loop), ("bulkCreateOrders", bulk)):
+        truncate(OrderLine, Order)
+        Product.objects.update(stock=10 * size)
+        queries = []
+        with connection.execute_wrapper(counting(queries)):
+            seconds, _ = timed(run, rows)
+        assert Order.objects.count() == size
+        report(f"{label} ({len(queries)} queries)", size, seconds)
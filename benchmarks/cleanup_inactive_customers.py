@@ -0,0 +1,70 @@
+"""
+Inactive-customer cleanup: one cascading delete() vs. the batched command.
+
+Reports total time and the longest single transaction (how long row locks
+are held on a live database).
+
+    python -m benchmarks.cleanup_inactive_customers --sizes 200000,2000000
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed, truncate
+
+sizes = parse_sizes("200000,2000000", __doc__)
+setup()
+
+import io  # noqa: E402
+import os  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+from datetime import timedelta  # noqa: E402
+
+from django.core.management import call_command  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from crm.management.commands.cleanup_inactive_customers import Command  # noqa: E402
+from crm.models import Customer, Order, OrderLine  # noqa: E402
+
+
+def legacy(cutoff):
+    with transaction.atomic():
+        Customer.objects.inactive(cutoff).delete()
+
+
+batch_times = []
+delete_batch = Command.delete_batch
+
+
+def timed_batch(self, *args):
+    start = time.perf_counter()
+    try:
+        return delete_batch(self, *args)
+    finally:
+        batch_times.append(time.perf_counter() - start)
+
+
+Command.delete_batch = timed_batch
+
+
+def batched(checkpoint):
+    call_command("cleanup_inactive_customers", "--checkpoint", checkpoint, "--batch-size", "1000", stdout=io.StringIO())
+
+
+for size in sizes:
+    def reseed():
+        truncate(OrderLine, Order, Customer)
+        # roughly half the customers end up with no order in the last year
+        seed(customers=size, orders=size, products=0)
+
+    reseed()
+    cutoff = timezone.now() - timedelta(days=365)
+    inactive = Customer.objects.inactive(cutoff).count()
+    legacy_seconds, _ = timed(legacy, cutoff)
+
+    reseed()
+    batch_times.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        batched_seconds, _ = timed(batched, os.path.join(tmp, "checkpoint.json"))
+    print(
+        f"{size:>8} customers ({inactive} inactive)  single delete {legacy_seconds:7.1f}s in one transaction   "
+        f"batched {batched_seconds:7.1f}s, longest transaction {max(batch_times) * 1e3:6.1f} ms"
+    )
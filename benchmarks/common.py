@@ -0,0 +1,95 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway test database (never db.sqlite3) and are
+started from the project root, e.g.::
+
+    python -m benchmarks.bulk_create_customers
+"""
+import argparse
+import os
+import time
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "alx_backend_graphql_crm.settings")
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def parse_sizes(default, description=""):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--sizes", default=default, help="comma separated row counts")
+    args = parser.parse_args()
+    return [int(size) for size in args.sizes.split(",")]
+
+
+def truncate(*models):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"DELETE FROM {model._meta.db_table}")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def report(label, rows, seconds):
+    print(f"{label:<28} {rows:>9} rows  {seconds:8.3f}s  {rows / seconds:>12,.0f} rows/s")
+
+
+def seed(customers=0, products=0, orders=0, lines_per_order=0, batch_size=10_000):
+    """Bulk-load synthetic rows; orders are spread over the last ~3 years."""
+    import random
+    from datetime import timedelta
+    from decimal import Decimal
+
+    from django.db import transaction
+    from django.utils import timezone
+
+    from crm.models import Customer, Order, OrderLine, Product
+
+    rng = random.Random(42)
+    now = timezone.now()
+
+    def batches(count, build):
+        for start in range(0, count, batch_size):
+            yield [build(i) for i in range(start, min(start + batch_size, count))]
+
+    with transaction.atomic():
+        for batch in batches(customers, lambda i: Customer(
+            name=f"Customer {i}", email=f"customer{i}@example.com",
+            phone=f"+{rng.randint(1, 99)}{rng.randint(10**9, 10**10 - 1)}",
+            created_at=now - timedelta(minutes=rng.randint(0, 1_500_000)),
+        )):
+            Customer.objects.bulk_create(batch)
+        for batch in batches(products, lambda i: Product(
+            name=f"Product {i}", price=Decimal(rng.randint(100, 100_000)) / 100, stock=rng.randint(0, 500),
+        )):
+            Product.objects.bulk_create(batch)
+
+        customer_ids = list(Customer.objects.values_list("pk", flat=True)[:max(customers, 1)])
+        product_ids = list(Product.objects.values_list("pk", flat=True)[:max(products, 1)])
+        for batch in batches(orders, lambda i: Order(
+            customer_id=rng.choice(customer_ids),
+            total_amount=Decimal(rng.randint(100, 1_000_000)) / 100,
+            order_date=now - timedelta(minutes=rng.randint(0, 1_500_000)),
+        )):
+            created = Order.objects.bulk_create(batch)
+            if lines_per_order:
+                OrderLine.objects.bulk_create(
+                    [
+                        OrderLine(order=order, product_id=product_id, quantity=1, unit_price=10)
+                        for order in created
+                        for product_id in rng.sample(product_ids, lines_per_order)
+                    ],
+                    batch_size=batch_size,
+                )
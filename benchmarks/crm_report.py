@@ -0,0 +1,72 @@
+"""
+Report generation: fetching every order and summing client-side vs. crmStats.
+
+    python -m benchmarks.crm_report --sizes 10000,100000
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed, truncate
+
+sizes = parse_sizes("10000,100000", __doc__)
+setup()
+
+import json  # noqa: E402
+from decimal import Decimal  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+
+from alx_backend_graphql_crm.schema import schema  # noqa: E402
+from crm.models import Customer, Order  # noqa: E402
+
+# Connections cap pages at 100 rows, so the client has to walk every page.
+CUSTOMERS = """
+query ($after: String) {
+  allCustomers(keyset: true, first: 100, after: $after) { pageInfo { hasNextPage endCursor } edges { node { id } } }
+}
+"""
+ORDERS = """
+query ($after: String) {
+  allOrders(keyset: true, first: 100, after: $after) { pageInfo { hasNextPage endCursor } edges { node { id totalAmount } } }
+}
+"""
+AGGREGATE = "query { crmStats { customerCount orderCount revenue } }"
+
+
+def execute(document, **variables):
+    result = schema.execute(document, variable_values=variables, context_value=SimpleNamespace())
+    assert not result.errors, result.errors
+    return result.data
+
+
+def fetch_all(document, field):
+    nodes, size, after = [], 0, None
+    while True:
+        data = execute(document, after=after)
+        size += len(json.dumps(data))
+        nodes.extend(edge["node"] for edge in data[field]["edges"])
+        if not data[field]["pageInfo"]["hasNextPage"]:
+            return size, nodes
+        after = data[field]["pageInfo"]["endCursor"]
+
+
+def client_side():
+    customer_bytes, customers = fetch_all(CUSTOMERS, "allCustomers")
+    order_bytes, orders = fetch_all(ORDERS, "allOrders")
+    revenue = sum(Decimal(order["totalAmount"]) for order in orders)
+    return customer_bytes + order_bytes, (len(customers), len(orders), revenue)
+
+
+def aggregate():
+    data = execute(AGGREGATE)
+    stats = data["crmStats"]
+    return len(json.dumps(data)), (stats["customerCount"], stats["orderCount"], Decimal(stats["revenue"]))
+
+
+for size in sizes:
+    truncate(Order, Customer)
+    seed(customers=size // 10, orders=size)
+
+    before, (before_bytes, expected) = timed(client_side)
+    after, (after_bytes, result) = timed(aggregate)
+    assert result == expected, (result, expected)
+    print(
+        f"{size:>8} orders  client-side {before * 1e3:8.1f} ms {before_bytes:>10} bytes   "
+        f"crmStats {after * 1e3:6.1f} ms {after_bytes:>4} bytes   ({before / after:6.1f}x)"
+    )
@@ -0,0 +1,67 @@
+"""
+"Customers who spent over X": aggregating orders vs. the order summary table.
+
+Seeds customers and orders, rebuilds the summaries, then times the top
+spenders query both ways, plus "last order date per customer".
+
+    python -m benchmarks.customer_order_summary --sizes 100000,1000000
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed, truncate
+
+sizes = parse_sizes("100000,1000000", __doc__)
+setup()
+
+from django.db.models import Max, Sum  # noqa: E402
+
+from crm.models import Customer, CustomerOrderSummary, Order  # noqa: E402
+from crm.order_summary import rebuild  # noqa: E402
+
+THRESHOLD = 40_000
+REPEAT = 5
+
+
+def aggregate_spenders():
+    return list(
+        Customer.objects.annotate(spend=Sum("orders__total_amount"))
+        .filter(spend__gte=THRESHOLD).order_by("-spend").values_list("pk", flat=True)[:100]
+    )
+
+
+def summary_spenders():
+    return list(
+        Customer.objects.filter(order_summary__lifetime_revenue__gte=THRESHOLD)
+        .order_by("-order_summary__lifetime_revenue").values_list("pk", flat=True)[:100]
+    )
+
+
+def aggregate_last_orders():
+    return list(Customer.objects.annotate(last=Max("orders__order_date")).values_list("pk", "last")[:1000])
+
+
+def summary_last_orders():
+    return list(Customer.objects.values_list("pk", "order_summary__last_order_date")[:1000])
+
+
+def repeated(fn):
+    for _ in range(REPEAT):
+        result = fn()
+    return result
+
+
+for orders in sizes:
+    truncate(CustomerOrderSummary, Order, Customer)
+    seed(customers=orders // 10, orders=orders)
+    seconds, rows = timed(rebuild)
+    print(f"{orders} orders, {orders // 10} customers: rebuild {rows} summaries in {seconds:.2f}s")
+    for label, slow, fast in (
+        (f"spend >= {THRESHOLD}", aggregate_spenders, summary_spenders),
+        ("last order per customer", aggregate_last_orders, summary_last_orders),
+    ):
+        slow_seconds, expected = timed(repeated, slow)
+        fast_seconds, actual = timed(repeated, fast)
+        if label.startswith("spend"):
+            assert set(actual) == set(expected), label
+        print(
+            f"  {label:<26} aggregate {slow_seconds / REPEAT * 1e3:9.1f} ms   "
+            f"summary {fast_seconds / REPEAT * 1e3:7.1f} ms"
+        )
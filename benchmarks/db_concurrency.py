@@ -0,0 +1,164 @@
+"""
+Parallel SQLite writers: stock Django settings vs. alx_backend_graphql_crm/database.py.
+
+Each mode gets its own temporary database file (never db.sqlite3). Writer
+processes place orders the way CreateOrder does, reading a product and
+then writing the order, its line and the stock, in one transaction. A
+reader process meanwhile runs report-style aggregates. The run counts
+committed orders, "database is locked" failures and reads.
+
+    baseline  rollback journal, deferred transactions, 5s busy timeout, no reuse
+    tuned     WAL, IMMEDIATE transactions, 20s busy timeout, CONN_MAX_AGE=60
+
+Then times GraphQL requests through the test client with and without
+persistent connections.
+
+    python -m benchmarks.db_concurrency --writers 2,4,8 --orders 200
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+MODES = ("baseline", "tuned")
+
+
+def configure(mode, path):
+    """Set up Django on ``path`` in ``mode``; call before any query."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = "alx_backend_graphql_crm.settings"
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    import django
+    from django.conf import settings
+    django.setup()
+    if mode == "baseline":
+        settings.DATABASES["default"].update(OPTIONS={}, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+
+
+def prepare(mode, path, products):
+    configure(mode, path)
+    from django.core.management import call_command
+
+    from crm.models import Customer, Product
+    call_command("migrate", verbosity=0)
+    Customer.objects.bulk_create(Customer(name=f"Customer {i}", email=f"c{i}@example.com") for i in range(100))
+    Product.objects.bulk_create(Product(name=f"Product {i}", price=10, stock=10**6) for i in range(products))
+
+
+def writer(mode, path, orders, products, seed):
+    import random
+
+    configure(mode, path)
+    from django.db import OperationalError, close_old_connections, transaction
+    from django.db.models import F
+
+    from crm.models import Customer, Order, OrderLine, Product
+
+    rng = random.Random(seed)
+    customer_ids = list(Customer.objects.values_list("pk", flat=True))
+    committed, locked, slowest = 0, 0, 0.0
+    began = time.perf_counter()
+    for _ in range(orders):
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                product = Product.objects.get(pk=rng.randint(1, products))
+                order = Order.objects.create(customer_id=rng.choice(customer_ids), total_amount=product.price)
+                OrderLine.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+                Product.objects.filter(pk=product.pk).update(stock=F("stock") - 1)
+            committed += 1
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+        slowest = max(slowest, time.perf_counter() - start)
+        # a web worker finishing its request
+        close_old_connections()
+    return committed, locked, slowest, time.perf_counter() - began
+
+
+def reader(mode, path, stop):
+    configure(mode, path)
+    from django.db import OperationalError, close_old_connections
+    from django.db.models import Count, Sum
+
+    from crm.models import Order
+    reads, locked = 0, 0
+    while not stop.is_set():
+        try:
+            Order.objects.aggregate(count=Count("pk"), revenue=Sum("total_amount"))
+            reads += 1
+        except OperationalError:
+            locked += 1
+        close_old_connections()
+    return reads, locked
+
+
+def run(mode, writers, orders, products):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "crm.sqlite3")
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            pool.apply(prepare, (mode, path, products))
+
+        stop = context.Manager().Event()
+        with context.Pool(writers + 1) as pool:
+            read = pool.apply_async(reader, (mode, path, stop))
+            results = pool.starmap(writer, [(mode, path, orders, products, seed) for seed in range(writers)])
+            stop.set()
+            reads, read_errors = read.get()
+
+    committed = sum(result[0] for result in results)
+    locked = sum(result[1] for result in results)
+    slowest = max(result[2] for result in results)
+    seconds = max(result[3] for result in results)
+    print(
+        f"  {mode:<9} {writers} writers  {committed:>6} committed  {locked:>5} locked  "
+        f"{committed / seconds:7.0f} orders/s  slowest {slowest * 1000:7.0f} ms  "
+        f"{reads:>6} reads ({read_errors} failed)"
+    )
+
+
+def requests(mode, count):
+    """GraphQL requests per second through the test client, one connection per request unless reused."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "crm.sqlite3")
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            pool.apply(prepare, (mode, path, 100))
+            return pool.apply(timed_requests, (mode, path, count))
+
+
+def timed_requests(mode, path, count):
+    configure(mode, path)
+    from django.db import close_old_connections
+    from django.test import Client, override_settings
+
+    client = Client()
+    body = {"query": "{ allProducts(first: 10) { edges { node { name stock } } } }"}
+    # every request reaches the database
+    with override_settings(GRAPHQL_RESPONSE_CACHE={"ENABLED": False}):
+        start = time.perf_counter()
+        for _ in range(count):
+            # the test client skips the request_started/finished connection
+            # handling a WSGI/ASGI server applies, so apply it here
+            close_old_connections()
+            client.post("/graphql/", body, content_type="application/json")
+            close_old_connections()
+        return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", default="2,4,8", help="comma separated writer process counts")
+    parser.add_argument("--orders", type=int, default=200, help="orders per writer")
+    parser.add_argument("--products", type=int, default=50, help="fewer products, more contention")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.orders} orders per writer")
+    for writers in [int(count) for count in args.writers.split(",")]:
+        for mode in MODES:
+            run(mode, writers, args.orders, args.products)
+    for mode in MODES:
+        print(f"  {mode:<9} {requests(mode, args.requests):7.0f} GraphQL requests/s")
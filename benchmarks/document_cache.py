@@ -0,0 +1,53 @@
+"""
+Per-request parse + validate cost with and without the document cache.
+
+    python -m benchmarks.document_cache --sizes 2000
+"""
+from benchmarks.common import parse_sizes, setup, timed
+
+sizes = parse_sizes("2000", __doc__)
+setup()
+
+from graphql import parse  # noqa: E402
+from graphql.validation import validate  # noqa: E402
+
+from alx_backend_graphql_crm.schema import schema  # noqa: E402
+from crm.documents import DocumentCache  # noqa: E402
+
+DOCUMENTS = {
+    "heartbeat": "query { hello }",
+    "low stock": """
+        mutation { updateLowStockProducts { message updatedProducts { id name stock } } }
+    """,
+    "reminders": """
+        query ($startDate: Date!) {
+          allOrders(orderDate_Gte: $startDate, first: 100) {
+            edges { node { id orderDate customer { email } products { edges { node { name } } } } }
+          }
+        }
+    """,
+}
+
+graphql_schema = schema.graphql_schema
+
+
+def uncached(query, iterations):
+    for _ in range(iterations):
+        validate(graphql_schema, parse(query))
+
+
+def cached(query, iterations):
+    cache = DocumentCache()
+    for _ in range(iterations):
+        cache.parse_and_validate(graphql_schema, query)
+
+
+for iterations in sizes:
+    for label, query in DOCUMENTS.items():
+        before, _ = timed(uncached, query, iterations)
+        after, _ = timed(cached, query, iterations)
+        print(
+            f"{label:<10} {iterations} requests  "
+            f"parse+validate {before / iterations * 1e6:8.1f} us/req   "
+            f"cached {after / iterations * 1e6:6.1f} us/req   ({before / after:5.1f}x)"
+        )
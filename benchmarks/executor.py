@@ -0,0 +1,73 @@
+"""
+Scheduled-job GraphQL calls: in-process executor vs. HTTP vs. the old gql client.
+
+The HTTP paths talk to a live server thread on an ephemeral port; the gql
+client reproduces the old cron jobs (fetch_schema_from_transport=True).
+
+    python -m benchmarks.executor --sizes 200
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed
+
+sizes = parse_sizes("200", __doc__)
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test.testcases import LiveServerThread  # noqa: E402
+from gql import Client, gql  # noqa: E402
+from gql.transport.requests import RequestsHTTPTransport  # noqa: E402
+
+from crm.executor import execute_http, execute_local  # noqa: E402
+
+DOCUMENTS = {
+    "heartbeat": "query { hello }",
+    "report": "query { crmStats { customerCount orderCount revenue } }",
+}
+
+seed(customers=1000, orders=10_000)
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "localhost"]
+
+# share the in-memory test database with the server thread, as LiveServerTestCase does
+connections["default"].inc_thread_sharing()
+# plain WSGI app; the static/media wrappers aren't needed for /graphql/
+server = LiveServerThread("localhost", lambda handler: WSGIHandler(), connections_override={"default": connections["default"]})
+server.daemon = True
+server.start()
+server.is_ready.wait()
+if server.error:
+    raise server.error
+url = f"http://localhost:{server.port}/graphql/"
+
+
+def in_process(query, iterations):
+    for _ in range(iterations):
+        execute_local(query)
+
+
+def http(query, iterations):
+    for _ in range(iterations):
+        execute_http(url, query)
+
+
+def gql_client(query, iterations):
+    for _ in range(iterations):
+        # each cron run built a new client and introspected the schema
+        client = Client(
+            transport=RequestsHTTPTransport(url=url, retries=3), fetch_schema_from_transport=True
+        )
+        client.execute(gql(query))
+
+
+for iterations in sizes:
+    for label, query in DOCUMENTS.items():
+        local, _ = timed(in_process, query, iterations)
+        remote, _ = timed(http, query, iterations)
+        legacy, _ = timed(gql_client, query, iterations)
+        print(
+            f"{label:<10} {iterations} runs  in-process {local / iterations * 1e3:6.2f} ms   "
+            f"http {remote / iterations * 1e3:6.2f} ms   "
+            f"gql+introspection {legacy / iterations * 1e3:6.2f} ms"
+        )
+
+server.terminate()
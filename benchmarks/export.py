@@ -0,0 +1,93 @@
+"""
+Streaming order exports vs. building the whole extract in memory.
+
+Seeds orders, then reads /graphql/export/orders/ through the test client as
+CSV, NDJSON and gzipped CSV, reporting time to first byte, time to the
+first rows, total time and peak memory (RSS). For comparison, the same rows
+are also materialized and JSON-encoded in one piece, as a GraphQL response
+would be (skipped above --materialize-max rows).
+
+    python -m benchmarks.export --sizes 1000000,5000000
+"""
+import argparse
+import json
+import resource
+import time
+
+from benchmarks.common import seed, setup, truncate
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--sizes", default="1000000,5000000", help="comma separated order counts")
+parser.add_argument("--materialize-max", type=int, default=1_000_000, help="largest size to materialize")
+args = parser.parse_args()
+setup()
+
+from django.test import Client  # noqa: E402
+
+from crm.exports import EXPORTS  # noqa: E402
+from crm.models import Customer, Order  # noqa: E402
+
+
+def reset_peak_rss():
+    # Linux: restart the high-water mark (VmHWM) from the current RSS, so
+    # each run reports its own peak; elsewhere peaks only ever grow
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def stream(label, path, **headers):
+    reset_peak_rss()
+    start = time.perf_counter()
+    response = Client().get(path, headers=headers)
+    content = iter(response.streaming_content)
+    first_byte = next(content)
+    ttfb = time.perf_counter() - start
+    size, first_rows = len(first_byte), None
+    for chunk in content:
+        if first_rows is None:
+            first_rows = time.perf_counter() - start
+        size += len(chunk)
+    seconds = time.perf_counter() - start
+    print(
+        f"  {label:<18} first byte {ttfb * 1000:7.1f} ms  first rows {(first_rows or seconds) * 1000:7.1f} ms  "
+        f"total {seconds:6.1f}s  {size / 2**20:8.1f} MiB  peak RSS {peak_rss_mb():7.0f} MiB"
+    )
+
+
+def materialize():
+    reset_peak_rss()
+    start = time.perf_counter()
+    columns = [column for column, _ in EXPORTS["orders"][2]]
+    rows = Order.objects.order_by("pk").values_list(*[path for _, path in EXPORTS["orders"][2]])
+    body = json.dumps({"data": [dict(zip(columns, row)) for row in rows]}, default=str).encode()
+    seconds = time.perf_counter() - start
+    print(
+        f"  {'materialized json':<18} first byte {seconds * 1000:7.0f} ms  "
+        f"total {seconds:6.1f}s  {len(body) / 2**20:8.1f} MiB  peak RSS {peak_rss_mb():7.0f} MiB"
+    )
+
+
+for orders in [int(size) for size in args.sizes.split(",")]:
+    truncate(Order, Customer)
+    seed(customers=orders // 10, orders=orders)
+    print(f"{orders} orders (peak RSS after seeding {peak_rss_mb():.0f} MiB)")
+    stream("csv", "/graphql/export/orders/")
+    stream("ndjson", "/graphql/export/orders/?format=ndjson")
+    stream("csv gzip", "/graphql/export/orders/", **{"Accept-Encoding": "gzip"})
+    stream("csv filtered", "/graphql/export/orders/?total_amount__gte=9990")
+    if orders <= args.materialize_max:
+        materialize()
@@ -0,0 +1,42 @@
+"""
+Query plans and latency for every CustomerFilter/ProductFilter/OrderFilter
+lookup and sort key on a large seeded dataset.
+
+    python -m benchmarks.filter_indexes --sizes 1000000
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed
+
+sizes = parse_sizes("1000000", __doc__)
+setup()
+
+from django.db import connection  # noqa: E402
+
+from crm.filters import CustomerFilter, OrderFilter, ProductFilter  # noqa: E402
+from crm.models import Customer, Order, Product  # noqa: E402
+
+CASES = [
+    ("customer created_at__gte", lambda: CustomerFilter({"created_at__gte": "2026-10-01"}, queryset=Customer.objects.all()).qs),
+    ("customer phone_pattern", lambda: CustomerFilter({"phone_pattern": "+42"}, queryset=Customer.objects.all()).qs),
+    ("customer name icontains", lambda: CustomerFilter({"name": "r 12345"}, queryset=Customer.objects.all()).qs),
+    ("customer order_by name", lambda: Customer.objects.order_by("name")),
+    ("product price range", lambda: ProductFilter({"price__gte": "100", "price__lte": "101"}, queryset=Product.objects.all()).qs),
+    ("product stock__lte", lambda: ProductFilter({"stock__lte": "1"}, queryset=Product.objects.all()).qs),
+    ("product order_by price", lambda: Product.objects.order_by("price")),
+    ("order order_date range", lambda: OrderFilter({"order_date__gte": "2026-10-17"}, queryset=Order.objects.all()).qs),
+    ("order total_amount__gte", lambda: OrderFilter({"total_amount__gte": "9999"}, queryset=Order.objects.all()).qs),
+    ("order product_id", lambda: OrderFilter({"product_id": "7"}, queryset=Order.objects.all()).qs),
+    ("order order_by -order_date", lambda: Order.objects.order_by("-order_date", "-id")),
+]
+
+for size in sizes:
+    seconds, _ = timed(seed, customers=size // 10, products=size // 10, orders=size, lines_per_order=1)
+    print(f"seeded {size} orders in {seconds:.1f}s")
+    if connection.vendor in ("sqlite", "postgresql"):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    for label, build in CASES:
+        qs = build()
+        plan = " | ".join(line.strip() for line in qs.explain().splitlines())
+        seconds, _ = timed(lambda: list(qs[:100]))
+        print(f"{label:<28} {seconds * 1000:9.2f} ms  {plan}")
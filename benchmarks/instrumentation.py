@@ -0,0 +1,50 @@
+"""
+Per-request overhead of the resolver/SQL instrumentation on /graphql/.
+
+Runs the same page query with instrumentation disabled, enabled (metrics
+registry only) and enabled with the debug header (timings in extensions).
+The response cache is off so every request executes.
+
+    python -m benchmarks.instrumentation --sizes 10,100
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed
+
+sizes = parse_sizes("10,100", __doc__)
+setup()
+
+import json  # noqa: E402
+
+from django.test import Client, override_settings  # noqa: E402
+
+from crm.response_cache import response_cache  # noqa: E402
+
+REQUESTS = 300
+QUERY = """
+query ($first: Int) {
+  allOrders(first: $first) { edges { node { id totalAmount customer { email } lines { quantity unitPrice } } } }
+}
+"""
+
+seed(customers=100, products=50, orders=1000, lines_per_order=3)
+response_cache.enabled = False
+client = Client()
+
+
+def run(page_size, headers):
+    body = json.dumps({"query": QUERY, "variables": {"first": page_size}})
+    for _ in range(REQUESTS):
+        client.post("/graphql/", body, content_type="application/json", headers=headers)
+
+
+for page_size in sizes:
+    run(page_size, {})  # warm up
+    with override_settings(GRAPHQL_INSTRUMENTATION={"ENABLED": False}):
+        disabled, _ = timed(run, page_size, {})
+    enabled, _ = timed(run, page_size, {})
+    debug, _ = timed(run, page_size, {"X-GraphQL-Debug": "1"})
+    per = 1e3 / REQUESTS
+    print(
+        f"first={page_size:<4} disabled {disabled * per:6.2f} ms   "
+        f"enabled {enabled * per:6.2f} ms (+{(enabled / disabled - 1) * 100:4.1f}%)   "
+        f"debug header {debug * per:6.2f} ms (+{(debug / disabled - 1) * 100:4.1f}%)"
+    )
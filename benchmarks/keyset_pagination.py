@@ -0,0 +1,45 @@
+"""
+Deep-page latency of allOrders: offset pagination vs. keyset cursors.
+
+    python -m benchmarks.keyset_pagination --sizes 1000000
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed
+
+sizes = parse_sizes("1000000", __doc__)
+setup()
+
+from types import SimpleNamespace  # noqa: E402
+
+from alx_backend_graphql_crm.schema import schema  # noqa: E402
+from crm.models import Order  # noqa: E402
+from crm.pagination import encode_cursor, keyset_ordering  # noqa: E402
+
+OFFSET = """
+query ($offset: Int) {
+  allOrders(first: 50, offset: $offset, orderBy: ["-order_date"]) { edges { node { id totalAmount } } }
+}
+"""
+KEYSET = """
+query ($after: String) {
+  allOrders(keyset: true, first: 50, after: $after, orderBy: ["-order_date"]) { edges { node { id totalAmount } } }
+}
+"""
+
+
+def execute(document, **variables):
+    result = schema.execute(document, variable_values=variables, context_value=SimpleNamespace())
+    assert not result.errors, result.errors
+    return result
+
+
+for size in sizes:
+    seconds, _ = timed(seed, customers=1000, orders=size)
+    print(f"seeded {size} orders in {seconds:.1f}s")
+
+    ordered = Order.objects.order_by("-order_date", "-pk")
+    keys = keyset_ordering(ordered)
+    for depth in (0, size // 10, size // 2, size - 100):
+        after = encode_cursor(ordered[depth - 1], keys) if depth else None
+        offset_seconds = min(timed(execute, OFFSET, offset=depth)[0] for _ in range(3))
+        keyset_seconds = min(timed(execute, KEYSET, after=after)[0] for _ in range(3))
+        print(f"depth {depth:>9}  offset {offset_seconds * 1000:9.2f} ms   keyset {keyset_seconds * 1000:9.2f} ms")
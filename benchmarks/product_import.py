@@ -0,0 +1,94 @@
+"""
+CSV product import: batched upserts vs. one save() per row (CreateProduct).
+
+Writes synthetic CSV files (about 1% invalid rows), then times
+``import_products`` loading them into an empty table and re-importing them
+over existing products (every row an update). The row-by-row baseline
+runs on the first --baseline-rows rows only.
+
+    python -m benchmarks.product_import --sizes 100000,1000000
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import setup, truncate
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--sizes", default="100000,1000000", help="comma separated row counts")
+parser.add_argument("--batch-size", type=int, default=5000)
+parser.add_argument("--baseline-rows", type=int, default=10_000)
+args = parser.parse_args()
+setup()
+
+from django.core.management import call_command  # noqa: E402
+
+from crm.models import Product  # noqa: E402
+from crm.product_import import validate_batch  # noqa: E402
+from crm.search import INDEXED, search_index  # noqa: E402
+
+WORDS = ["desk", "lamp", "chair", "monitor", "cable", "leather", "wallet", "steel", "bottle", "notebook"]
+
+
+def write_csv(path, rows, rng):
+    with open(path, "w", newline="") as f:
+        f.write("sku,name,price,stock\n")
+        for i in range(rows):
+            name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}"
+            price, stock = f"{rng.randint(100, 100_000) / 100:.2f}", str(rng.randint(0, 500))
+            bad = rng.random()
+            if bad < 0.004:
+                price = "-1"
+            elif bad < 0.007:
+                stock = "many"
+            elif bad < 0.01:
+                name = ""
+            f.write(f"SKU-{i:08d},{name},{price},{stock}\n")
+
+
+def clear():
+    truncate(Product)
+    for kind in INDEXED:
+        search_index().clear(kind, "default")
+
+
+def run_command(path):
+    out = io.StringIO()
+    start = time.perf_counter()
+    call_command("import_products", path, "--batch-size", str(args.batch_size), stdout=out)
+    return time.perf_counter() - start, out.getvalue().splitlines()[0]
+
+
+def row_by_row(path, limit):
+    # what CreateProduct does per row: validate, then a full save()
+    import csv
+    start = time.perf_counter()
+    with open(path, newline="") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            if i == limit:
+                break
+            products, _ = validate_batch([row])
+            if products[0] is not None:
+                products[0].save()
+    return time.perf_counter() - start
+
+
+rng = random.Random(42)
+with tempfile.TemporaryDirectory() as tmp:
+    for rows in [int(size) for size in args.sizes.split(",")]:
+        path = os.path.join(tmp, f"products_{rows}.csv")
+        write_csv(path, rows, rng)
+        print(f"{rows} rows ({os.path.getsize(path) / 2**20:.0f} MiB), search backend {search_index().name}")
+
+        clear()
+        baseline_rows = min(rows, args.baseline_rows)
+        seconds = row_by_row(path, baseline_rows)
+        print(f"  row by row save()  {baseline_rows:>9} rows  {seconds:7.1f}s  {baseline_rows / seconds * 60:>12,.0f} rows/min")
+
+        clear()
+        for label in ("import (inserts)", "re-import (updates)"):
+            seconds, summary = run_command(path)
+            print(f"  {label:<18} {rows:>9} rows  {seconds:7.1f}s  {rows / seconds * 60:>12,.0f} rows/min  {summary}")
@@ -0,0 +1,110 @@
+"""
+CRM report chord: wall time vs. partition count on a real Celery worker.
+
+Seeds a temporary SQLite database (never db.sqlite3), starts a prefork
+worker with --concurrency processes on kombu's filesystem broker and the
+file result backend (no Redis needed), then times ``report_chord`` from
+dispatch to the reduced report for each partition count, next to the
+single-query crmStats aggregate run in-process.
+
+Partitions only run in parallel on as many cores as the worker has; on
+one CPU more partitions add task overhead without any speedup.
+
+    python -m benchmarks.report_fanout --orders 1000000 --partitions 1,2,4,8 --concurrency 4
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.common import timed
+
+
+def configure(tmp):
+    """Point Django and the crm Celery app at the files under ``tmp``; call before any query."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = "alx_backend_graphql_crm.settings"
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/crm.sqlite3"
+    import django
+    from django.conf import settings
+    django.setup()
+    queue = os.path.join(tmp, "queue")
+    os.makedirs(queue, exist_ok=True)
+    os.makedirs(os.path.join(tmp, "results"), exist_ok=True)
+    # the crm app loads these CELERY_* settings on first use
+    settings.CELERY_BROKER_URL = "filesystem://"
+    settings.CELERY_BROKER_TRANSPORT_OPTIONS = {
+        "data_folder_in": queue, "data_folder_out": queue, "polling_interval": 0.01,
+        "control_folder": os.path.join(tmp, "control"),
+    }
+    settings.CELERY_RESULT_BACKEND = f"file://{tmp}/results"
+    settings.CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+    settings.CRM_REPORT = {"LOG_FILE": os.path.join(tmp, "report.log")}
+
+    from crm.celery import app
+    import crm.tasks  # noqa: F401  registers the tasks
+    return app
+
+
+def worker(tmp, concurrency):
+    app = configure(tmp)
+    app.worker_main(["worker", "--pool=prefork", f"--concurrency={concurrency}", "--loglevel=warning"])
+
+
+def prepare(tmp, orders):
+    configure(tmp)
+    from django.core.management import call_command
+
+    from benchmarks.common import seed
+    call_command("migrate", verbosity=0)
+    seed(customers=max(orders // 10, 1), orders=orders)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            pool.apply(prepare, (tmp, args.orders))
+
+        configure(tmp)
+        from crm.stats import CRMStats
+        from crm.tasks import aggregate_orders, report_chord
+
+        process = context.Process(target=worker, args=(tmp, args.concurrency))
+        process.start()
+        try:
+            # wait until the worker is consuming
+            aggregate_orders.delay(0, 0).get(timeout=120)
+
+            print(f"{os.cpu_count()} CPUs, worker concurrency {args.concurrency}, {args.orders} orders")
+            stats = CRMStats()
+            seconds, _ = timed(lambda: (stats.order_count, stats.revenue))
+            print(f"  crmStats in-process      1 query              {seconds * 1e3:8.1f} ms")
+
+            baseline = None
+            for partitions in [int(count) for count in args.partitions.split(",")]:
+                size = math.ceil(args.orders / partitions)
+                best = math.inf
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    # the file backend polls for the chord's completion; poll often
+                    report = report_chord(size).apply_async(interval=0.01, countdown=0).get(timeout=600, interval=0.01)
+                    best = min(best, time.perf_counter() - start)
+                baseline = baseline or best
+                print(
+                    f"  chord {partitions:>3} partitions  {size:>9} orders each  {best * 1e3:8.1f} ms  "
+                    f"({baseline / best:4.2f}x)  {report.split(' - ', 1)[1]}"
+                )
+        finally:
+            process.terminate()
+            process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--partitions", default="1,2,4,8", help="comma separated partition counts")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    main(parser.parse_args())
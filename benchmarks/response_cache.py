@@ -0,0 +1,42 @@
+"""
+/graphql/ latency for a repeated read query with and without the response cache.
+
+    python -m benchmarks.response_cache --sizes 1000,10000
+"""
+from benchmarks.common import parse_sizes, seed, setup, timed, truncate
+
+sizes = parse_sizes("1000,10000", __doc__)
+setup()
+
+import json  # noqa: E402
+
+from django.core.cache import caches  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from crm.models import Customer, Order, OrderLine, Product  # noqa: E402
+from crm.response_cache import response_cache  # noqa: E402
+
+QUERY = json.dumps({"query": "{ allProducts(first: 50) { edges { node { name price stock } } } }"})
+REQUESTS = 200
+
+client = Client()
+
+
+def run(iterations):
+    for _ in range(iterations):
+        client.post("/graphql/", QUERY, content_type="application/json")
+
+
+for size in sizes:
+    truncate(OrderLine, Order, Customer, Product)
+    seed(customers=10, products=size, orders=0)
+
+    response_cache.enabled = False
+    before, _ = timed(run, REQUESTS)
+    response_cache.enabled = True
+    caches["default"].clear()
+    after, _ = timed(run, REQUESTS)
+    print(
+        f"{size:>7} products  uncached {before / REQUESTS * 1e3:6.2f} ms/req   "
+        f"cached {after / REQUESTS * 1e3:6.2f} ms/req   ({before / after:5.1f}x)"
+    )
@@ -0,0 +1,87 @@
+"""
+Product search latency: FTS5 vs. the token-table index vs. icontains scans.
+
+Seeds products with names drawn from a small vocabulary plus a model code
+("Rugged Steel Laptop X4821"), indexes them with each backend and times
+typical queries (top 20).
+
+    python -m benchmarks.search --sizes 1000000
+"""
+from benchmarks.common import parse_sizes, setup, timed, truncate
+
+sizes = parse_sizes("1000000", __doc__)
+setup()
+
+import random  # noqa: E402
+from decimal import Decimal  # noqa: E402
+
+from django.db import transaction  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from crm.models import Product, SearchToken  # noqa: E402
+from crm.search import rebuild, search  # noqa: E402
+
+ADJECTIVES = "rugged compact wireless premium classic smart portable ergonomic vintage deluxe".split()
+MATERIALS = "steel oak leather carbon bamboo glass ceramic cotton titanium nylon".split()
+NOUNS = (
+    "laptop stand lamp desk chair mug keyboard mouse monitor bag bottle headphones speaker charger "
+    "cable backpack notebook pen wallet watch"
+).split()
+QUERIES = {
+    "one common word": "laptop",
+    "two words": "leather wallet",
+    "prefix": "head",
+    "rare model code": "x4821",
+    "no match": "zebra",
+}
+REPEAT = 5
+
+
+def seed_products(count, batch_size=10_000):
+    rng = random.Random(42)
+    with transaction.atomic():
+        for start in range(0, count, batch_size):
+            Product.objects.bulk_create([
+                Product(
+                    name=f"{rng.choice(ADJECTIVES).title()} {rng.choice(MATERIALS).title()} "
+                         f"{rng.choice(NOUNS).title()} X{rng.randint(1000, 99999)}",
+                    price=Decimal(rng.randint(100, 100_000)) / 100,
+                )
+                for _ in range(start, min(start + batch_size, count))
+            ])
+
+
+def icontains(query):
+    products = Product.objects.all()
+    for word in query.split():
+        products = products.filter(name__icontains=word)
+    return list(products.values_list("pk", flat=True)[:20])
+
+
+def repeated(fn, *args):
+    for _ in range(REPEAT):
+        result = fn(*args)
+    return result
+
+
+for size in sizes:
+    truncate(SearchToken, Product)
+    seconds, _ = timed(seed_products, size)
+    print(f"{size} products seeded in {seconds:.1f}s")
+
+    backends = {}
+    for backend in ("fts5", "tokens"):
+        settings = override_settings(CRM_SEARCH={"BACKEND": backend, "FILTERS": False})
+        with settings:
+            seconds, _ = timed(transaction.atomic()(rebuild), "product", 10_000)
+        print(f"  {backend:<7} index built in {seconds:.1f}s")
+        backends[backend] = settings
+
+    for label, query in QUERIES.items():
+        timings = {"icontains": timed(repeated, icontains, query)[0]}
+        for backend, settings in backends.items():
+            with settings:
+                timings[backend] = timed(repeated, search, query, ["product"], 20)[0]
+        print(f"  {label:<17} {query!r:<17} " + "  ".join(
+            f"{name} {seconds / REPEAT * 1e3:8.1f} ms" for name, seconds in timings.items()
+        ))
@@ -0,0 +1,20 @@
+"""
+Settings for benchmark servers started by the load-test scripts.
+
+Same as the project settings, but on a throwaway SQLite file (BENCH_DB) so
+db.sqlite3 is never touched, reachable on localhost, and with the response
+cache off so every request executes.
+"""
+import os
+
+from alx_backend_graphql_crm.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["BENCH_DB"],
+        "OPTIONS": {"timeout": 30},
+    }
+}
+ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
+GRAPHQL_RESPONSE_CACHE = {"ENABLED": False}
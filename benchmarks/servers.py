@@ -0,0 +1,30 @@
+"""
+WSGI/ASGI entry points for benchmark servers (see benchmarks/server_settings.py).
+
+BENCH_SQL_LATENCY_MS adds a sleep before every SQL query to model a database
+across a network, where request time is spent waiting rather than on CPU.
+"""
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.server_settings")
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+asgi_application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+SQL_LATENCY = float(os.environ.get("BENCH_SQL_LATENCY_MS", 0)) / 1000
+
+if SQL_LATENCY:
+    from django.db.backends.signals import connection_created
+
+    def network_latency(execute, sql, params, many, context):
+        time.sleep(SQL_LATENCY)
+        return execute(sql, params, many, context)
+
+    def add_latency(sender, connection, **kwargs):
+        connection.execute_wrappers.append(network_latency)
+
+    connection_created.connect(add_latency, weak=False)
@@ -0,0 +1,23 @@
+from django.conf import settings
+
+DEFAULTS = {
+    "MAX_OPERATIONS": 100,
+    # batches sent with this header run in one transaction, all or nothing
+    "ATOMIC_HEADER": "X-GraphQL-Batch-Atomic",
+}
+
+SKIPPED = "Not executed: an earlier operation in this atomic batch failed and the batch was rolled back."
+
+
+def batch_options():
+    return {**DEFAULTS, **getattr(settings, "GRAPHQL_BATCH", {})}
+
+
+def payload_errors(data):
+    """
+    True when a top-level mutation payload reports ``errors``.
+
+    CRM mutations return their validation errors in the payload rather than
+    as GraphQL errors, so an atomic batch checks both (when selected).
+    """
+    return any(isinstance(value, dict) and value.get("errors") for value in (data or {}).values())
@@ -0,0 +1,195 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from graphene import relay
+from graphene_django.settings import graphene_settings
+from graphql import (
+    GraphQLError,
+    ValidationRule,
+    get_named_type,
+    get_operation_ast,
+    is_leaf_type,
+    value_from_ast_untyped,
+)
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, VariableNode
+
+DEFAULTS = {
+    "MAX_COST": 25_000,
+    "MAX_DEPTH": 8,
+    # "Type.field": weight; object fields weigh 1 and scalars 0 by default
+    "FIELD_WEIGHTS": {},
+}
+
+
+# operation name -> (cost, depth) of the document being validated, see recording_costs()
+_recorded_costs = ContextVar("crm_recorded_costs", default=None)
+
+
+def cost_options():
+    return {**DEFAULTS, **getattr(settings, "GRAPHQL_QUERY_COST", {})}
+
+
+@contextmanager
+def recording_costs():
+    """
+    Collect the ``(cost, depth)`` QueryCostRule computes for each operation
+    validated in the block, keyed by operation name (None when anonymous).
+    """
+    costs = {}
+    token = _recorded_costs.set(costs)
+    try:
+        yield costs
+    finally:
+        _recorded_costs.reset(token)
+
+
+def is_connection(graphql_type):
+    graphene_type = getattr(graphql_type, "graphene_type", None)
+    return isinstance(graphene_type, type) and issubclass(graphene_type, relay.Connection)
+
+
+class CostEstimator:
+    """
+    Worst-case cost of an operation: roughly the number of objects it can return.
+
+    Every object field costs its weight plus its selections. A connection
+    costs its weight plus ``first``/``last`` (or the relay page limit when
+    absent or a variable without a default) times the cost of one node, so
+    nested connections multiply. Depth counts fields, not the edges/node
+    wrappers. Introspection fields are free.
+    """
+
+    def __init__(self, schema, fragments, weights=None):
+        self.schema = schema
+        self.fragments = fragments
+        self.weights = weights or {}
+        self.max_page = graphene_settings.RELAY_CONNECTION_MAX_LIMIT or 100
+
+    def operation(self, operation):
+        root = self.schema.get_root_type(operation.operation)
+        defaults = {
+            definition.variable.name.value: value_from_ast_untyped(definition.default_value)
+            for definition in operation.variable_definitions
+            if definition.default_value is not None
+        }
+        return self.selections(root, operation.selection_set, defaults, 0)
+
+    def fields(self, parent_type, selection_set, seen=()):
+        """Yield ``(parent_type, FieldNode)`` pairs, expanding fragments."""
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield parent_type, selection
+                continue
+            if isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in seen:
+                    continue
+                seen = (*seen, name)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment = selection
+            else:
+                continue
+            condition = fragment.type_condition
+            fragment_type = self.schema.get_type(condition.name.value) if condition else parent_type
+            yield from self.fields(fragment_type or parent_type, fragment.selection_set, seen)
+
+    def selections(self, parent_type, selection_set, variables, depth):
+        """Return ``(cost, depth)`` of a selection set."""
+        cost, max_depth = 0, depth
+        for field_parent, node in self.fields(parent_type, selection_set):
+            name = node.name.value
+            field = getattr(field_parent, "fields", {}).get(name)
+            if name.startswith("__") or field is None:
+                continue
+            field_type = get_named_type(field.type)
+            weight = self.weights.get(f"{field_parent.name}.{name}", 0 if is_leaf_type(field_type) else 1)
+
+            if is_connection(field_type):
+                node_cost, node_depth = self.connection(field_type, node.selection_set, variables, depth + 1)
+                cost += weight + self.page_size(node, variables) * node_cost
+            elif is_leaf_type(field_type):
+                cost, node_depth = cost + weight, depth + 1
+            else:
+                child_cost, node_depth = self.selections(field_type, node.selection_set, variables, depth + 1)
+                cost += weight + child_cost
+            max_depth = max(max_depth, node_depth)
+        return cost, max_depth
+
+    def connection(self, connection_type, selection_set, variables, depth):
+        """Cost of one node of a connection, looking through edges { node }."""
+        cost, max_depth = 0, depth
+        for _, field in self.fields(connection_type, selection_set):
+            if field.name.value != "edges":
+                continue
+            edge_type = get_named_type(connection_type.fields["edges"].type)
+            for _, edge_field in self.fields(edge_type, field.selection_set):
+                if edge_field.name.value != "node":
+                    continue
+                node_type = get_named_type(edge_type.fields["node"].type)
+                node_cost, node_depth = self.selections(node_type, edge_field.selection_set, variables, depth)
+                cost += 1 + node_cost
+                max_depth = max(max_depth, node_depth)
+        return cost, max_depth
+
+    def page_size(self, node, variables):
+        sizes = []
+        for argument in node.arguments:
+            if argument.name.value not in ("first", "last"):
+                continue
+            value = argument.value
+            if isinstance(value, VariableNode):
+                size = variables.get(value.name.value)
+            else:
+                size = value_from_ast_untyped(value)
+            sizes.append(size if isinstance(size, int) and size >= 0 else self.max_page)
+        return min(min(sizes), self.max_page) if sizes else self.max_page
+
+
+def fragments(document):
+    return {
+        definition.name.value: definition
+        for definition in document.definitions
+        if definition.kind == "fragment_definition"
+    }
+
+
+def estimate_cost(schema, document, operation_name=None, recorded=None):
+    """
+    ``(cost, depth)`` of the operation of ``document`` that would execute,
+    taken from ``recorded`` (see recording_costs()) when it has it.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return 0, 0
+    name = operation.name.value if operation.name else None
+    if recorded and name in recorded:
+        return recorded[name]
+    return CostEstimator(schema, fragments(document), cost_options()["FIELD_WEIGHTS"]).operation(operation)
+
+
+class QueryCostRule(ValidationRule):
+    """Reject operations over the ``GRAPHQL_QUERY_COST`` cost or depth budget."""
+
+    def enter_operation_definition(self, node, *args):
+        options = cost_options()
+        estimator = CostEstimator(self.context.schema, fragments(self.context.document), options["FIELD_WEIGHTS"])
+        cost, depth = estimator.operation(node)
+        recorded = _recorded_costs.get()
+        if recorded is not None:
+            recorded[node.name.value if node.name else None] = (cost, depth)
+        if cost > options["MAX_COST"]:
+            self.report_error(GraphQLError(
+                f"Query cost {cost} exceeds the maximum of {options['MAX_COST']}",
+                node,
+                extensions={"code": "QUERY_TOO_EXPENSIVE", "cost": cost, "maxCost": options["MAX_COST"]},
+            ))
+        if depth > options["MAX_DEPTH"]:
+            self.report_error(GraphQLError(
+                f"Query depth {depth} exceeds the maximum of {options['MAX_DEPTH']}",
+                node,
+                extensions={"code": "QUERY_TOO_DEEP", "depth": depth, "maxDepth": options["MAX_DEPTH"]},
+            ))
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 """
-Script to query recent pending orders via GraphQL and log reminders.
+Script to log reminders for orders placed in the last 7 days.
+
+Orders are streamed (a server-side cursor in-process, or keyset-paged
+allOrders when CRM_GRAPHQL_URL points at a remote API) and each customer is
+reminded once, so memory stays flat however busy the week was.
 """
 
+import os
 import sys
 import logging
-from datetime import datetime, timedelta
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+from datetime import timedelta
+from pathlib import Path
 
 # Configure logging
 LOG_FILE = "/tmp/order_reminders_log.txt"
@@ -18,45 +22,34 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "alx_backend_graphql_crm.settings")
+
+
 def main():
     try:
-        # Set up GraphQL client
-        transport = RequestsHTTPTransport(
-            url="http://localhost:8000/graphql",
-            verify=False,
-            retries=3,
-        )
-        client = Client(transport=transport, fetch_schema_from_transport=True)
+        import django
+        django.setup()
 
-        # Calculate date range (last 7 days)
-        today = datetime.now().date()
-        week_ago = today - timedelta(days=7)
+        from django.conf import settings
+        from django.utils import timezone
 
-        # Define GraphQL query
-        query = gql(
-            """
-            query GetRecentOrders($startDate: Date!) {
-                orders(orderDate_Gte: $startDate) {
-                    id
-                    customer {
-                        email
-                    }
-                }
-            }
-            """
-        )
+        from crm.reminders import recent_orders, recent_orders_paged, reminders
 
-        # Execute query
-        result = client.execute(query, variable_values={"startDate": str(week_ago)})
+        # Calculate date range (last 7 days)
+        week_ago = timezone.localdate() - timedelta(days=7)
 
-        orders = result.get("orders", [])
-        if not orders:
-            logging.info("No recent orders found.")
+        if settings.GRAPHQL_EXECUTOR_URL:
+            orders = recent_orders_paged(week_ago)
         else:
-            for order in orders:
-                order_id = order.get("id")
-                customer_email = order.get("customer", {}).get("email")
-                logging.info(f"Order ID: {order_id}, Customer Email: {customer_email}")
+            orders = recent_orders(week_ago)
+
+        sent = 0
+        for reminder in reminders(orders):
+            logging.info(reminder)
+            sent += 1
+        if not sent:
+            logging.info("No recent orders found.")
 
         # Print success message to console
         print("Order reminders processed!")
@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULTS = {
+    # DATABASES alias of the read replica; reads stay on the primary without one
+    "REPLICA": "replica",
+    # after a client mutates, its reads go to the primary for this long
+    # (should cover the replica's lag)
+    "STICKY_SECONDS": 10,
+    "COOKIE": "crm_read_primary_until",
+}
+
+# alias the current GraphQL query operation reads from; None means the primary
+_read_alias = ContextVar("crm_read_alias", default=None)
+
+
+def routing_options():
+    return {**DEFAULTS, **getattr(settings, "CRM_DB_ROUTING", {})}
+
+
+def replica_alias():
+    alias = routing_options()["REPLICA"]
+    return alias if alias and alias in settings.DATABASES else None
+
+
+@contextmanager
+def reading_from(alias):
+    """Route ORM reads in the block to ``alias`` (None: the primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def current_read_alias():
+    return _read_alias.get()
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to the primary. Reads go to the replica only inside
+    ``reading_from(replica)``, which the GraphQL view enters for query
+    operations of clients that haven't just mutated, and never inside a
+    transaction on the primary, so read-modify-write code sees its own
+    writes. Everything else (mutations, admin, commands) reads the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # also for instances read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+# ---------- Read-your-writes ----------
+def reads_primary(request):
+    """True while ``request``'s client is pinned to the primary after a mutation."""
+    if getattr(request, "graphql_wrote", False):
+        return True
+    try:
+        return float(request.COOKIES.get(routing_options()["COOKIE"], 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_alias(request):
+    """Where a query operation of ``request`` should read: the replica or None (primary)."""
+    alias = replica_alias()
+    if alias is None or reads_primary(request):
+        return None
+    return alias
+
+
+def mark_written(request):
+    """Pin the rest of ``request`` and, through a cookie, its client's next reads to the primary."""
+    request.graphql_wrote = True
+
+
+def pin_response(request, response):
+    if getattr(request, "graphql_wrote", False) and replica_alias() is not None:
+        options = routing_options()
+        seconds = options["STICKY_SECONDS"]
+        response.set_cookie(
+            options["COOKIE"], f"{time.time() + seconds:.3f}", max_age=seconds, httponly=True, samesite="Lax",
+        )
+    return response
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import parse
+from graphql.validation import validate
+
+from .complexity import recording_costs
+
+
+def query_hash(query):
+    """sha256 hex digest of a query, as used by automatic persisted queries."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """
+    Bounded LRU of parsed, validated GraphQL documents keyed by query hash.
+
+    Only documents that validated cleanly are kept, so a hit can go straight
+    to execution. Hit and miss counts are kept for monitoring.
+    ``parse_and_validate`` stores ``(document, costs)`` pairs.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def set(self, key, document):
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.maxsize:
+                self._documents.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._documents)
+
+    def parse_and_validate(self, schema, query, rules=None, max_errors=None):
+        """
+        Return ``(document, errors, costs)`` for ``query``, from cache when
+        possible. ``costs`` holds the per-operation ``(cost, depth)`` the
+        QueryCostRule computed while validating (empty without that rule).
+
+        Parse errors propagate as ``GraphQLSyntaxError`` like ``parse()``.
+        """
+        key = query_hash(query)
+        cached = self.get(key)
+        if cached is not None:
+            document, costs = cached
+            return document, [], costs
+        document = parse(query)
+        with recording_costs() as costs:
+            errors = validate(schema, document, rules, max_errors)
+        if not errors:
+            self.set(key, (document, costs))
+        return document, errors, costs
+
+
+document_cache = DocumentCache(getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 256))
+
+
+class PersistedQueryNotFound(Exception):
+    pass
+
+
+class PersistedQueryStore:
+    """
+    Registry of hash -> query text for the automatic persisted query protocol.
+
+    Stored in Django's cache framework (``GRAPHQL_PERSISTED_QUERY_CACHE``
+    alias, ``default`` by default) so every worker shares the registry.
+    """
+
+    prefix = "crm:pq:"
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, "GRAPHQL_PERSISTED_QUERY_CACHE", "default")
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, sha256):
+        query = self.cache.get(self.prefix + sha256)
+        if query is None:
+            raise PersistedQueryNotFound(sha256)
+        return query
+
+    def register(self, query, sha256=None):
+        """Store ``query`` under its hash; a client-supplied hash must match."""
+        digest = query_hash(query)
+        if sha256 is not None and sha256 != digest:
+            raise ValueError("provided sha does not match query")
+        self.cache.set(self.prefix + digest, query, timeout=None)
+        return digest
+
+
+persisted_queries = PersistedQueryStore()
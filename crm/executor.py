@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import requests
+from django.conf import settings
+from graphql import GraphQLError, OperationType, get_operation_ast, parse
+
+from .db_routing import replica_alias, reading_from
+
+
+class GraphQLExecutionError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(str(error.get("message", error)) for error in errors))
+
+
+def execute(query, variables=None, operation_name=None, url=None, timeout=30):
+    """
+    Run a GraphQL document for scheduled jobs and return its ``data``.
+
+    By default the document runs in-process against the project schema, so
+    cron/Celery jobs skip HTTP, JSON and schema introspection and don't take
+    a web worker slot. Pass ``url`` or set ``GRAPHQL_EXECUTOR_URL`` to post
+    to a remote ``/graphql/`` instead. Errors raise GraphQLExecutionError.
+    """
+    url = url or getattr(settings, "GRAPHQL_EXECUTOR_URL", None)
+    if url:
+        return execute_http(url, query, variables, operation_name, timeout)
+    return execute_local(query, variables, operation_name)
+
+
+def execute_local(query, variables=None, operation_name=None):
+    from alx_backend_graphql_crm.schema import schema
+
+    # query operations (reports) read the replica when there is one
+    try:
+        operation = get_operation_ast(parse(query), operation_name)
+    except GraphQLError:
+        operation = None
+    alias = replica_alias() if operation is not None and operation.operation == OperationType.QUERY else None
+    with reading_from(alias):
+        result = schema.execute(
+            query,
+            variable_values=variables,
+            operation_name=operation_name,
+            # fresh context per run so request-scoped loaders don't leak
+            context_value=SimpleNamespace(),
+        )
+    if result.errors:
+        raise GraphQLExecutionError([error.formatted for error in result.errors])
+    return result.data
+
+
+def execute_http(url, query, variables=None, operation_name=None, timeout=30):
+    payload = {"query": query, "variables": variables or {}}
+    if operation_name:
+        payload["operationName"] = operation_name
+    response = requests.post(url, json=payload, timeout=timeout)
+    response.raise_for_status()
+    body = response.json()
+    if body.get("errors"):
+        raise GraphQLExecutionError(body["errors"])
+    return body["data"]
@@ -0,0 +1,122 @@
+import graphene
+from django.db.models.query import QuerySet
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.utils import maybe_queryset
+from graphql import GraphQLError
+
+from .loaders import get_loader
+from .optimizer import optimize_queryset
+from .pagination import encode_cursor, keyset_page
+
+# keyset page size without first/last when RELAY_CONNECTION_MAX_LIMIT is unset
+DEFAULT_PAGE_SIZE = 100
+
+
+class CountableConnection(graphene.relay.Connection):
+    """Relay connection with a ``totalCount`` that is only counted when asked for."""
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(root, info):
+        if root.length is None:
+            root.length = root.iterable.count()
+        return root.length
+
+
+class BatchedFilterConnectionField(DjangoFilterConnectionField):
+    """
+    DjangoFilterConnectionField that cooperates with the request loader.
+
+    Querysets are narrowed to the requested selection set before slicing
+    (see crm/optimizer.py). Every page it returns is registered as a sibling
+    group, so relations resolved on its nodes are loaded for the whole page
+    at once. Resolvers may also return an already-loaded list, which is
+    paginated as-is.
+
+    ``order_by`` is exposed as a field argument. With ``keyset=True`` clients
+    can pass ``keyset: true`` to page by seeking past the last row's ordering
+    key instead of by offset (see crm/pagination.py).
+    """
+
+    def __init__(self, type_, *args, order_by=None, keyset=False, **kwargs):
+        if keyset:
+            kwargs["keyset"] = graphene.Boolean(
+                description="Page with keyset cursors (no COUNT, constant cost per page)."
+            )
+        super().__init__(type_, *args, **kwargs)
+        if order_by is not None:
+            # DjangoFilterConnectionField swallows order_by instead of exposing it
+            self.args = {**self._base_args, "order_by": order_by}
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        if isinstance(iterable, list):
+            return iterable
+        queryset = super().resolve_queryset(
+            connection, iterable, info, args, filtering_args, filterset_class
+        )
+        if isinstance(queryset, QuerySet):
+            queryset = optimize_queryset(queryset, info)
+        return queryset
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                            max_limit, enforce_first_or_last, root, info, **args):
+        if args.get("keyset"):
+            result = cls.keyset_connection_resolver(
+                resolver, connection, default_manager, queryset_resolver, max_limit, root, info, **args
+            )
+        else:
+            result = super().connection_resolver(
+                resolver, connection, default_manager, queryset_resolver,
+                max_limit, enforce_first_or_last, root, info, **args
+            )
+        get_loader(info).register(edge.node for edge in result.edges)
+        return result
+
+    @classmethod
+    def keyset_connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                                   max_limit, root, info, **args):
+        first = args.get("first")
+        last = args.get("last")
+        if args.get("offset") is not None:
+            raise GraphQLError("offset can't be combined with keyset pagination")
+        if first is not None and last is not None:
+            raise GraphQLError("Pass either first or last with keyset pagination, not both")
+        limit = first if first is not None else last
+        if limit is not None and limit < 0:
+            argument = "first" if first is not None else "last"
+            raise GraphQLError(f"Argument '{argument}' must be a non-negative integer.")
+        if limit is None:
+            limit = max_limit or DEFAULT_PAGE_SIZE
+        elif max_limit and limit > max_limit:
+            raise GraphQLError(
+                f"Requesting {limit} records on the `{info.field_name}` connection "
+                f"exceeds the limit of {max_limit} records."
+            )
+
+        iterable = resolver(root, info, **args)
+        if iterable is None:
+            iterable = default_manager
+        queryset = maybe_queryset(queryset_resolver(connection, iterable, info, args))
+        if not isinstance(queryset, QuerySet):
+            raise GraphQLError(f"`{info.field_name}` doesn't support keyset pagination")
+
+        after, before = args.get("after"), args.get("before")
+        backward = last is not None
+        nodes, keys, has_more = keyset_page(queryset, limit, after=after, before=before, backward=backward)
+
+        edges = [connection.Edge(node=node, cursor=encode_cursor(node, keys)) for node in nodes]
+        page_info = graphene.relay.PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=has_more if backward else bool(after),
+            has_next_page=bool(before) if backward else has_more,
+        )
+        result = connection(edges=edges, page_info=page_info)
+        result.iterable = queryset
+        result.length = None  # counted lazily by CountableConnection
+        return result
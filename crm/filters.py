@@ -1,27 +1,69 @@
 import django_filters
-from .models import Customer, Product, Order
+from django.db.models import Exists, OuterRef, Q
+from .models import Customer, Product, Order, OrderLine
+from .search import filter_matching, search_options
+
+
+def text_filter(queryset, kind, field, value, lookup="pk"):
+    """
+    Substring match on ``field`` of ``kind`` objects (related by ``lookup``),
+    or, with ``CRM_SEARCH["FILTERS"]``, a prefix match on its words through
+    the search index, which avoids scanning the table.
+    """
+    if search_options()["FILTERS"]:
+        return filter_matching(queryset, kind, value, field, lookup)
+    path = field if lookup == "pk" else f"{lookup.removesuffix('_id')}__{field}"
+    return queryset.filter(**{f"{path}__icontains": value})
 
 
 # ---------- Customer Filters ----------
 class CustomerFilter(django_filters.FilterSet):
-    name = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
-    email = django_filters.CharFilter(field_name="email", lookup_expr="icontains")
+    name = django_filters.CharFilter(field_name="name", method="filter_text")
+    email = django_filters.CharFilter(field_name="email", method="filter_text")
     created_at__gte = django_filters.DateFilter(field_name="created_at", lookup_expr="gte")
     created_at__lte = django_filters.DateFilter(field_name="created_at", lookup_expr="lte")
     phone_pattern = django_filters.CharFilter(method="filter_phone_pattern")
 
+    # Order totals read the maintained CustomerOrderSummary (indexed columns)
+    # instead of aggregating every order; no orders counts as 0.
+    order_count__gte = django_filters.NumberFilter(field_name="order_summary__order_count", method="filter_at_least")
+    order_count__lte = django_filters.NumberFilter(field_name="order_summary__order_count", method="filter_at_most")
+    lifetime_revenue__gte = django_filters.NumberFilter(field_name="order_summary__lifetime_revenue", method="filter_at_least")
+    lifetime_revenue__lte = django_filters.NumberFilter(field_name="order_summary__lifetime_revenue", method="filter_at_most")
+    first_order_date__gte = django_filters.DateFilter(field_name="order_summary__first_order_date", lookup_expr="gte")
+    first_order_date__lte = django_filters.DateFilter(field_name="order_summary__first_order_date", lookup_expr="lte")
+    last_order_date__gte = django_filters.DateFilter(field_name="order_summary__last_order_date", lookup_expr="gte")
+    last_order_date__lte = django_filters.DateFilter(field_name="order_summary__last_order_date", lookup_expr="lte")
+
     class Meta:
         model = Customer
         fields = ["name", "email", "created_at", "phone"]
 
+    def filter_text(self, queryset, name, value):
+        return text_filter(queryset, "customer", name, value)
+
     def filter_phone_pattern(self, queryset, name, value):
         """Filter customers whose phone starts with a given prefix (e.g., +1)."""
         return queryset.filter(phone__startswith=value)
 
+    def filter_at_least(self, queryset, name, value):
+        """``>= value``, including customers without orders when value <= 0."""
+        condition = Q(**{f"{name}__gte": value})
+        if value <= 0:
+            condition |= Q(order_summary__isnull=True)
+        return queryset.filter(condition)
+
+    def filter_at_most(self, queryset, name, value):
+        """``<= value``, including customers without orders when value >= 0."""
+        condition = Q(**{f"{name}__lte": value})
+        if value >= 0:
+            condition |= Q(order_summary__isnull=True)
+        return queryset.filter(condition)
+
 
 # ---------- Product Filters ----------
 class ProductFilter(django_filters.FilterSet):
-    name = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
+    name = django_filters.CharFilter(field_name="name", method="filter_name")
     price__gte = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
     price__lte = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
     stock__gte = django_filters.NumberFilter(field_name="stock", lookup_expr="gte")
@@ -31,6 +73,9 @@ class ProductFilter(django_filters.FilterSet):
         model = Product
         fields = ["name", "price", "stock"]
 
+    def filter_name(self, queryset, name, value):
+        return text_filter(queryset, "product", "name", value)
+
 
 # ---------- Order Filters ----------
 class OrderFilter(django_filters.FilterSet):
@@ -38,10 +83,19 @@ class OrderFilter(django_filters.FilterSet):
     total_amount__lte = django_filters.NumberFilter(field_name="total_amount", lookup_expr="lte")
     order_date__gte = django_filters.DateFilter(field_name="order_date", lookup_expr="gte")
     order_date__lte = django_filters.DateFilter(field_name="order_date", lookup_expr="lte")
-    customer_name = django_filters.CharFilter(field_name="customer__name", lookup_expr="icontains")
-    product_name = django_filters.CharFilter(field_name="products__name", lookup_expr="icontains")
+    customer_name = django_filters.CharFilter(method="filter_customer_name")
+    product_name = django_filters.CharFilter(method="filter_product_name")
     product_id = django_filters.NumberFilter(field_name="products__id", lookup_expr="exact")
 
     class Meta:
         model = Order
         fields = ["total_amount", "order_date", "customer", "products"]
+
+    def filter_customer_name(self, queryset, name, value):
+        return text_filter(queryset, "customer", "name", value, lookup="customer_id")
+
+    def filter_product_name(self, queryset, name, value):
+        # EXISTS rather than a join through the lines, which repeated an
+        # order once per matching product
+        lines = text_filter(OrderLine.objects.filter(order=OuterRef("pk")), "product", "name", value, lookup="product_id")
+        return queryset.filter(Exists(lines))
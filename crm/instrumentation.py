@@ -0,0 +1,195 @@
+import threading
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULTS = {
+    "ENABLED": True,
+    # requests carrying this header get their timings in response extensions
+    "DEBUG_HEADER": "X-GraphQL-Debug",
+}
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def instrumentation_options():
+    return {**DEFAULTS, **getattr(settings, "GRAPHQL_INSTRUMENTATION", {})}
+
+
+def field_key(info):
+    """
+    The schema field being resolved, e.g. ``OrderType.customer``.
+
+    Not the response path: aliases are chosen by clients, and keying the
+    process-wide metrics by them would let any client add label sets
+    without bound.
+    """
+    return f"{info.parent_type.name}.{info.field_name}"
+
+
+class Trace:
+    """
+    Timings of one GraphQL request.
+
+    ``fields`` maps a schema field (``field_key``) to ``[calls, seconds, sql_queries,
+    sql_seconds]``; SQL is attributed to the resolver running when it is
+    issued (resolvers don't nest in synchronous execution).
+    """
+
+    def __init__(self):
+        self.fields = defaultdict(lambda: [0, 0.0, 0, 0.0])
+        self.current = None
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.operation = None
+        self.started = perf_counter()
+        self.seconds = None
+
+    def execute_sql(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            self.sql_queries += 1
+            self.sql_seconds += elapsed
+            if self.current is not None:
+                stats = self.fields[self.current]
+                stats[2] += 1
+                stats[3] += elapsed
+
+    @contextmanager
+    def capture(self):
+        """Time the block and count SQL issued on every database under it."""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self.execute_sql))
+            try:
+                yield self
+            finally:
+                self.seconds = perf_counter() - self.started
+
+    def summary(self):
+        def ms(seconds):
+            return round(seconds * 1000, 3)
+
+        return {
+            "duration": ms(self.seconds or perf_counter() - self.started),
+            "sqlQueries": self.sql_queries,
+            "sqlDuration": ms(self.sql_seconds),
+            "resolvers": {
+                key: {"calls": calls, "duration": ms(seconds), "sqlQueries": queries, "sqlDuration": ms(sql)}
+                for key, (calls, seconds, queries, sql) in self.fields.items()
+            },
+        }
+
+
+class InstrumentationMiddleware:
+    """Graphene middleware recording wall time per schema field into a Trace."""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    def resolve(self, next, root, info, **args):
+        trace = self.trace
+        key = field_key(info)
+        previous, trace.current = trace.current, key
+        start = perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            stats = trace.fields[key]
+            stats[0] += 1
+            stats[1] += perf_counter() - start
+            trace.current = previous
+
+
+class MetricsRegistry:
+    """
+    Process-wide aggregate of request traces, rendered in Prometheus text format.
+
+    Each worker process keeps its own registry; Prometheus scrapes and sums
+    them per instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.fields = defaultdict(lambda: [0, 0.0, 0, 0.0])
+            self.requests = defaultdict(int)
+            self.request_seconds = 0.0
+            self.request_buckets = [0] * len(REQUEST_BUCKETS)
+            self.sql_queries = 0
+            self.sql_seconds = 0.0
+
+    def record(self, trace, operation):
+        with self._lock:
+            self.requests[operation] += 1
+            self.request_seconds += trace.seconds
+            for i, bound in enumerate(REQUEST_BUCKETS):
+                if trace.seconds <= bound:
+                    self.request_buckets[i] += 1
+            self.sql_queries += trace.sql_queries
+            self.sql_seconds += trace.sql_seconds
+            for key, stats in trace.fields.items():
+                totals = self.fields[key]
+                for i, value in enumerate(stats):
+                    totals[i] += value
+
+    def render(self, extra=()):
+        """
+        Prometheus exposition text.
+
+        ``extra`` adds families as ``(name, help, type, [(labels, value), ...])``.
+        """
+        with self._lock:
+            count = sum(self.requests.values())
+            fields = sorted(self.fields.items())
+            families = [
+                ("crm_graphql_requests_total", "GraphQL requests by operation type.", "counter",
+                 [({"operation": operation}, value) for operation, value in sorted(self.requests.items())]),
+                ("crm_graphql_sql_queries_total", "SQL queries issued by GraphQL requests.", "counter",
+                 [({}, self.sql_queries)]),
+                ("crm_graphql_sql_duration_seconds_total", "Time spent in SQL by GraphQL requests.", "counter",
+                 [({}, self.sql_seconds)]),
+                ("crm_graphql_resolver_calls_total", "Resolver calls by schema field.", "counter",
+                 [({"field": key}, stats[0]) for key, stats in fields]),
+                ("crm_graphql_resolver_duration_seconds_total", "Resolver wall time by schema field.", "counter",
+                 [({"field": key}, stats[1]) for key, stats in fields]),
+                ("crm_graphql_resolver_sql_queries_total", "SQL queries issued under each schema field.", "counter",
+                 [({"field": key}, stats[2]) for key, stats in fields]),
+                ("crm_graphql_resolver_sql_duration_seconds_total", "SQL time under each schema field.", "counter",
+                 [({"field": key}, stats[3]) for key, stats in fields]),
+            ]
+            histogram = "crm_graphql_request_duration_seconds"
+            latency = [
+                f"# HELP {histogram} GraphQL request latency.",
+                f"# TYPE {histogram} histogram",
+                *(f'{histogram}_bucket{{le="{bound}"}} {value}'
+                  for bound, value in zip(REQUEST_BUCKETS, self.request_buckets)),
+                f'{histogram}_bucket{{le="+Inf"}} {count}',
+                f"{histogram}_sum {self.request_seconds}",
+                f"{histogram}_count {count}",
+            ]
+
+        lines = latency
+        for name, help_text, kind, samples in [*families, *extra]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,101 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import prefetch_related_objects
+
+
+# Connection arguments that only paginate; anything else is a filter.
+PAGINATION_ARGS = {"first", "last", "before", "after", "offset"}
+
+
+class RelationLoader:
+    """
+    Per-request batch loader for relations between CRM objects.
+
+    Connection fields register the page of nodes they return as a group of
+    siblings. The first time a relation (``customer``, ``products``,
+    ``orders``) is resolved on one node, it is loaded for every sibling in
+    the group with a single ``id__in`` query, and the rest of the page is
+    served from the cache.
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self._batched = set()
+
+    def register(self, instances):
+        """Record instances as one sibling group. First registration wins."""
+        group = []
+        for obj in instances:
+            if id(obj) not in self._groups:
+                self._groups[id(obj)] = group
+                group.append(obj)
+        return group
+
+    def load(self, instance, relation):
+        """Return a single related object (foreign key or one-to-one), or None."""
+        self._batch(instance, relation)
+        return related_object(instance, relation)
+
+    def load_many(self, instance, relation, args=None):
+        """
+        Return the related objects of a many-valued relation as a list.
+
+        Filtered lookups can't be served from the batch, so they fall back
+        to a queryset the connection field filters as usual.
+        """
+        if args and any(v is not None for k, v in args.items() if k not in PAGINATION_ARGS):
+            return getattr(instance, relation).all()
+        self._batch(instance, relation)
+        return list(getattr(instance, relation).all())
+
+    def _batch(self, instance, relation):
+        group = self._groups.get(id(instance)) or self.register([instance])
+        key = (id(group), relation)
+        if key in self._batched:
+            return
+        self._batched.add(key)
+        # Relations may already be loaded by the queryset optimizer.
+        pending = [obj for obj in group if not is_loaded(obj, relation)]
+        prefetch_related_objects(pending, relation)
+        # The loaded objects are siblings too, so relations nested below
+        # them are batched across the whole page.
+        self.register(related_objects(group, relation))
+
+
+def is_loaded(instance, relation):
+    field = instance._meta.get_field(relation)
+    if field.many_to_one or field.one_to_one:
+        return field.is_cached(instance)
+    return relation in getattr(instance, "_prefetched_objects_cache", {})
+
+
+def related_object(instance, relation):
+    try:
+        return getattr(instance, relation)
+    except ObjectDoesNotExist:
+        # reverse one-to-one without a row
+        return None
+
+
+def related_objects(instances, relation):
+    for obj in instances:
+        value = related_object(obj, relation)
+        if value is None:
+            continue
+        if hasattr(value, "all"):
+            yield from value.all()
+        else:
+            yield value
+
+
+def get_loader(info):
+    """Return the loader bound to the current request, creating it on first use."""
+    context = info.context
+    loader = getattr(context, "crm_loader", None)
+    if loader is None:
+        loader = RelationLoader()
+        try:
+            context.crm_loader = loader
+        except AttributeError:
+            # No request to hang it on (e.g. schema.execute without context)
+            pass
+    return loader
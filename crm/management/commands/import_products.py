@@ -0,0 +1,43 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crm.product_import import import_options, import_products
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update products by sku from a CSV file with a sku,name,price[,stock] "
+        "header, in batches, writing rejected rows to a side file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import")
+        parser.add_argument(
+            "--rejects", help="where to write rejected rows (default: <path>.rejects.csv)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=import_options()["BATCH_SIZE"], help="rows per transaction",
+        )
+
+    def handle(self, *args, path, rejects, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        rejects = rejects or f"{path}.rejects.csv"
+        start = time.perf_counter()
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as f, open(rejects, "w", newline="") as out:
+                result = import_products(f, out, batch_size)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        seconds = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Created {result.created}, updated {result.updated}, rejected {result.rejected} "
+            f"in {seconds:.1f}s"
+        )
+        if result.rejected:
+            self.stdout.write(f"Rejected rows written to {rejects}")
+        else:
+            os.remove(rejects)
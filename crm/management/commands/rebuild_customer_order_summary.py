@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from crm.order_summary import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every customer order summary from the orders table, in one "
+        "transaction (e.g. after orders were changed with raw SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="summaries per INSERT")
+
+    def handle(self, *args, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        self.stdout.write(f"Rebuilt customer order summaries: {rebuild(batch_size)}")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from crm.search import INDEXED, rebuild, search_index
+
+
+class Command(BaseCommand):
+    help = "Reindex products and customers for search (e.g. after switching CRM_SEARCH backends)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kinds", nargs="*", help=f"any of {', '.join(INDEXED)} (default: all)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="objects per indexing batch")
+
+    def handle(self, *args, kinds, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        unknown = set(kinds) - set(INDEXED)
+        if unknown:
+            raise CommandError(f"Unknown kinds: {', '.join(sorted(unknown))}")
+        self.stdout.write(f"Search backend: {search_index().name}")
+        for kind in kinds or INDEXED:
+            self.stdout.write(f"Indexed {kind}s: {rebuild(kind, batch_size)}")
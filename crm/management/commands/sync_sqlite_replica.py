@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from crm.db_routing import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over the replica's file, standing in "
+        "for replication when both are local SQLite files."
+    )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No replica configured; set DATABASE_REPLICA_URL")
+        source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if source.vendor != "sqlite" or target.vendor != "sqlite":
+            raise CommandError("Only SQLite databases can be copied; use the database's own replication")
+        source.ensure_connection()
+        target.ensure_connection()
+        # online backup: consistent even while the primary is being written
+        source.connection.backup(target.connection)
+        self.stdout.write(f"Copied {source.settings_dict['NAME']} to {target.settings_dict['NAME']}")
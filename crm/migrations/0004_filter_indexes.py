@@ -0,0 +1,85 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+# Indexes Django can't express portably. On PostgreSQL, trigram GIN
+# indexes on UPPER(col::text) match what icontains compiles to. On SQLite,
+# LIKE (used for startswith) can only use a NOCASE index; icontains can't be
+# indexed there at all.
+VENDOR_INDEXES = {
+    "postgresql": [
+        ("CREATE EXTENSION IF NOT EXISTS pg_trgm", None),
+        (
+            "CREATE INDEX IF NOT EXISTS crm_customer_name_trgm ON crm_customer USING gin ((UPPER(name::text)) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS crm_customer_name_trgm",
+        ),
+        (
+            "CREATE INDEX IF NOT EXISTS crm_customer_email_trgm ON crm_customer USING gin ((UPPER(email::text)) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS crm_customer_email_trgm",
+        ),
+        (
+            "CREATE INDEX IF NOT EXISTS crm_product_name_trgm ON crm_product USING gin ((UPPER(name::text)) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS crm_product_name_trgm",
+        ),
+    ],
+    "sqlite": [
+        (
+            "CREATE INDEX IF NOT EXISTS crm_customer_phone_nocase ON crm_customer (phone COLLATE NOCASE)",
+            "DROP INDEX IF EXISTS crm_customer_phone_nocase",
+        ),
+    ],
+}
+
+
+def create_vendor_indexes(apps, schema_editor):
+    for sql, _ in VENDOR_INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_vendor_indexes(apps, schema_editor):
+    for _, sql in reversed(VENDOR_INDEXES.get(schema_editor.connection.vendor, [])):
+        if sql:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0003_orderline'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['name'], name='crm_customer_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['created_at'], name='crm_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone'], name='crm_customer_phone_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_date', 'id'], name='crm_order_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['total_amount'], name='crm_order_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name'], name='crm_product_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='crm_product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stock'], name='crm_product_stock_idx'),
+        ),
+        migrations.RunPython(create_vendor_indexes, drop_vendor_indexes),
+    ]
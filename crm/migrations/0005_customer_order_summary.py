@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:12
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def populate_summaries(apps, schema_editor):
+    """Summaries of existing orders; same aggregate as crm.order_summary.rebuild()."""
+    Order = apps.get_model("crm", "Order")
+    CustomerOrderSummary = apps.get_model("crm", "CustomerOrderSummary")
+    rows = (
+        Order.objects.order_by()
+        .values("customer_id")
+        .annotate(count=Count("pk"), revenue=Sum("total_amount"), first=Min("order_date"), last=Max("order_date"))
+        .order_by("customer_id")
+    )
+    CustomerOrderSummary.objects.bulk_create(
+        (
+            CustomerOrderSummary(
+                customer_id=row["customer_id"],
+                order_count=row["count"],
+                lifetime_revenue=Decimal(row["revenue"] or 0).quantize(Decimal("0.01")),
+                first_order_date=row["first"],
+                last_order_date=row["last"],
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0004_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerOrderSummary',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_summary', serialize=False, to='crm.customer')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('lifetime_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('first_order_date', models.DateTimeField()),
+                ('last_order_date', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['order_count'], name='crm_summary_count_idx'), models.Index(fields=['lifetime_revenue'], name='crm_summary_revenue_idx'), models.Index(fields=['first_order_date'], name='crm_summary_first_idx'), models.Index(fields=['last_order_date'], name='crm_summary_last_idx')],
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
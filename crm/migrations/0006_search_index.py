@@ -0,0 +1,113 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:17
+
+import re
+import unicodedata
+
+from django.db import OperationalError, migrations, models
+
+# Frozen copy of crm/search.py as of this migration, so later changes to
+# that module don't change what this migration builds.
+INDEXED = {
+    "product": ("crm", "Product", ("name",)),
+    "customer": ("crm", "Customer", ("name", "email")),
+}
+MAX_TOKEN_LENGTH = 64
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+BATCH_SIZE = 2000
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(text)]
+
+
+def fts5_supported(connection):
+    if connection.vendor != "sqlite":
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE temp.crm_fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.crm_fts5_probe")
+    except OperationalError:
+        return False
+    return True
+
+
+def fts_table(kind):
+    return f"crm_{kind}_fts"
+
+
+def batches(model, fields, using):
+    rows = model.objects.using(using).only("pk", *fields).order_by("pk").iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for obj in rows:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_search_index(apps, schema_editor):
+    """FTS5 tables on SQLite builds that have FTS5, indexed from existing rows; the token table otherwise."""
+    connection = schema_editor.connection
+    fts5 = fts5_supported(connection)
+    SearchToken = apps.get_model("crm", "SearchToken")
+    for kind, (app_label, model_name, fields) in INDEXED.items():
+        model = apps.get_model(app_label, model_name)
+        if fts5:
+            table = fts_table(kind)
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                f"USING fts5({', '.join(fields)}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            placeholders = ", ".join(["%s"] * (len(fields) + 1))
+            for batch in batches(model, fields, connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES ({placeholders})",
+                        [(obj.pk, *(getattr(obj, field) or "" for field in fields)) for obj in batch],
+                    )
+        else:
+            for batch in batches(model, fields, connection.alias):
+                SearchToken.objects.using(connection.alias).bulk_create(
+                    [
+                        SearchToken(kind=kind, object_id=obj.pk, field=field, token=token)
+                        for obj in batch
+                        for field in fields
+                        for token in dict.fromkeys(tokenize(getattr(obj, field)))
+                    ],
+                    batch_size=500,
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for kind in INDEXED:
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table(kind)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0005_customer_order_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(max_length=20)),
+                ('token', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'token', 'object_id'], name='crm_search_token_idx'), models.Index(fields=['object_id', 'kind', 'token'], name='crm_search_object_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
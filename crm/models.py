@@ -1,30 +1,193 @@
 
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Exists, F, OuterRef, sql
 from django.utils import timezone
 
+
+def supports_update_returning(connection):
+    """UPDATE ... RETURNING is available on PostgreSQL and SQLite 3.35+."""
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" and connection.features.can_return_columns_from_insert
+
+
+class CustomerQuerySet(models.QuerySet):
+    def inactive(self, cutoff):
+        """Customers created before ``cutoff`` with no orders since then."""
+        recent_orders = Order.objects.filter(customer=OuterRef("pk"), order_date__gte=cutoff)
+        return self.filter(~Exists(recent_orders), created_at__lt=cutoff)
+
+
 class Customer(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = CustomerQuerySet.as_manager()
+
+    class Meta:
+        # Backs CustomerFilter; icontains lookups are covered per backend
+        # in migration 0004.
+        indexes = [
+            models.Index(fields=["name"], name="crm_customer_name_idx"),
+            models.Index(fields=["created_at"], name="crm_customer_created_idx"),
+            # pattern ops so phone__startswith can use it on PostgreSQL
+            models.Index(fields=["phone"], name="crm_customer_phone_idx", opclasses=["varchar_pattern_ops"]),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    def restock(self, threshold, amount):
+        """
+        Add ``amount`` to every product of the queryset with stock below
+        ``threshold``.
+
+        The increment is a single ``stock = stock + amount`` UPDATE, so it
+        composes with concurrent stock changes instead of overwriting them,
+        and returns the updated products (via RETURNING where supported).
+        """
+        # a write: never the replica a read queryset may be routed to
+        alias = self._db or router.db_for_write(self.model, **self._hints)
+        queryset = self.using(alias).filter(stock__lt=threshold)
+        connection = connections[alias]
+        if not supports_update_returning(connection):
+            with transaction.atomic(using=alias):
+                ids = list(queryset.select_for_update().values_list("pk", flat=True))
+                self.using(alias).filter(pk__in=ids).update(stock=F("stock") + amount)
+                return list(self.using(alias).filter(pk__in=ids))
+
+        # the ORM's own UPDATE for the queryset's filters, plus RETURNING
+        query = queryset.query.chain(sql.UpdateQuery)
+        query.add_update_values({"stock": F("stock") + amount})
+        update_sql, params = query.get_compiler(alias).as_sql()
+
+        meta = self.model._meta
+        qn = connection.ops.quote_name
+        fields = meta.concrete_fields
+        field_names = [f.attname for f in fields]
+        # Same value conversion the ORM applies (e.g. SQLite decimals)
+        columns = [f.get_col(meta.db_table) for f in fields]
+        converters = [
+            (col, connection.ops.get_db_converters(col) + col.get_db_converters(connection))
+            for col in columns
+        ]
+        products = []
+        with transaction.mark_for_rollback_on_error(using=alias), connection.cursor() as cursor:
+            cursor.execute(f"{update_sql} RETURNING {', '.join(qn(f.column) for f in fields)}", params)
+            for row in cursor.fetchall():
+                values = []
+                for value, (col, funcs) in zip(row, converters):
+                    for func in funcs:
+                        value = func(value, col, connection)
+                    values.append(value)
+                products.append(self.model.from_db(alias, field_names, values))
+        return products
+
+
 class Product(models.Model):
+    # natural key for catalog imports (crm/product_import.py)
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="crm_product_name_idx"),
+            models.Index(fields=["price"], name="crm_product_price_idx"),
+            models.Index(fields=["stock"], name="crm_product_stock_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
 
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="orders")
-    products = models.ManyToManyField(Product, related_name="orders")
+    products = models.ManyToManyField(Product, through="OrderLine", related_name="orders")
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     order_date = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # date range filters and the default (order_date, id) ordering
+            models.Index(fields=["order_date", "id"], name="crm_order_date_id_idx"),
+            models.Index(fields=["total_amount"], name="crm_order_total_idx"),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.customer.name}"
+
+
+class OrderLine(models.Model):
+    """One product on an order, with the price it was sold at."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="order_lines")
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        # Reuses the table of the former auto-created Order.products M2M
+        db_table = "crm_order_products"
+        unique_together = ("order", "product")
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} on order {self.order_id}"
+
+
+class CustomerOrderSummary(models.Model):
+    """
+    Order totals of one customer, kept up to date as orders are written.
+
+    Lets customers be filtered and sorted by spend or recency with an
+    indexed lookup instead of aggregating their orders. Only customers with
+    orders have a row. Maintained by crm/order_summary.py; rebuild with
+    ``manage.py rebuild_customer_order_summary``.
+    """
+    customer = models.OneToOneField(
+        Customer, on_delete=models.CASCADE, primary_key=True, related_name="order_summary"
+    )
+    order_count = models.PositiveIntegerField(default=0)
+    lifetime_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    first_order_date = models.DateTimeField()
+    last_order_date = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["order_count"], name="crm_summary_count_idx"),
+            models.Index(fields=["lifetime_revenue"], name="crm_summary_revenue_idx"),
+            models.Index(fields=["first_order_date"], name="crm_summary_first_idx"),
+            models.Index(fields=["last_order_date"], name="crm_summary_last_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.order_count} orders, {self.lifetime_revenue} for customer {self.customer_id}"
+
+
+class SearchToken(models.Model):
+    """
+    One token of an indexed field, for the portable search backend
+    (crm/search.py); SQLite databases use FTS5 tables instead.
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=20)
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        indexes = [
+            # prefix ranges of the driving term, then lookups of the other
+            # terms (and reindexing) per object; object_id leads so grouping
+            # by it doesn't tempt the planner into scanning a whole kind
+            models.Index(fields=["kind", "token", "object_id"], name="crm_search_token_idx"),
+            models.Index(fields=["object_id", "kind", "token"], name="crm_search_object_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} {self.field}: {self.token}"
@@ -0,0 +1,100 @@
+from django.core.exceptions import FieldDoesNotExist
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+from .loaders import PAGINATION_ARGS
+
+
+def selected_fields(info, selection_set):
+    """Yield the FieldNodes of a selection set, expanding fragments."""
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, FragmentSpreadNode):
+            yield from selected_fields(info, info.fragments[selection.name.value].selection_set)
+        elif isinstance(selection, InlineFragmentNode):
+            yield from selected_fields(info, selection.selection_set)
+
+
+def node_fields(info, field_nodes):
+    """Yield the fields requested on the nodes of a connection (edges { node { ... } })."""
+    for field in field_nodes:
+        for edges in selected_fields(info, field.selection_set):
+            if edges.name.value != "edges":
+                continue
+            for node in selected_fields(info, edges.selection_set):
+                if node.name.value == "node":
+                    yield from selected_fields(info, node.selection_set)
+
+
+def has_filters(field):
+    return any(arg.name.value not in PAGINATION_ARGS for arg in field.arguments)
+
+
+def collect(info, model, fields, prefix=""):
+    """
+    Map requested GraphQL fields onto the model.
+
+    Returns ``(only, select_related, prefetch_related)`` lookups; ``only`` is
+    None when a field doesn't map to a model field and columns can't be
+    safely narrowed.
+    """
+    only, select, prefetch = {f"{prefix}{model._meta.pk.name}"}, [], []
+    for field in fields:
+        name = to_snake_case(field.name.value)
+        if name in ("id", "__typename"):
+            continue
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            only = None
+            continue
+
+        lookup = f"{prefix}{name}"
+        if model_field.many_to_one:
+            select.append(lookup)
+            related_only, related_select, _ = collect(
+                info, model_field.related_model,
+                selected_fields(info, field.selection_set), f"{lookup}__",
+            )
+            select.extend(related_select)
+            if only is not None:
+                only.add(lookup)
+                if related_only is None:
+                    only = None
+                else:
+                    only |= related_only
+        elif model_field.is_relation:
+            # Nested connection; filtered ones are queried per node anyway.
+            if not prefix and not has_filters(field):
+                prefetch.append(lookup)
+        elif only is not None:
+            only.add(lookup)
+    return only, select, prefetch
+
+
+def optimize_queryset(queryset, info):
+    """
+    Narrow a connection queryset to what the selection set actually asks for.
+
+    Only the requested columns are loaded, forward foreign keys are joined
+    with ``select_related`` and many-valued relations are prefetched for the
+    page, so nodes never fall back to lazy per-row queries.
+    """
+    only, select, prefetch = collect(
+        info, queryset.model, node_fields(info, info.field_nodes)
+    )
+    if only is not None:
+        # Keep ordering columns loaded; keyset cursors are built from them.
+        for name in queryset.query.order_by:
+            if isinstance(name, str) and "__" not in name and name != "?":
+                only.add(name.lstrip("-"))
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only is not None:
+        queryset = queryset.only(*only)
+    return queryset
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Min, Sum
+
+from .models import CustomerOrderSummary, Order
+from .response_cache import invalidate
+from .stats import CENTS
+
+SUMMARY_FIELDS = ("order_count", "lifetime_revenue", "first_order_date", "last_order_date")
+
+
+def order_totals(orders):
+    """Per-customer summary values of an Order queryset, ordered by customer."""
+    return (
+        orders.order_by()
+        .values("customer_id")
+        .annotate(
+            order_count=Count("pk"),
+            lifetime_revenue=Sum("total_amount"),
+            first_order_date=Min("order_date"),
+            last_order_date=Max("order_date"),
+        )
+        .order_by("customer_id")
+    )
+
+
+def summary_from_totals(row):
+    return CustomerOrderSummary(
+        customer_id=row["customer_id"],
+        order_count=row["order_count"],
+        # SQLite sums decimals as floats
+        lifetime_revenue=Decimal(row["lifetime_revenue"] or 0).quantize(CENTS),
+        first_order_date=row["first_order_date"],
+        last_order_date=row["last_order_date"],
+    )
+
+
+@transaction.atomic
+def record_orders(orders):
+    """
+    Add newly created orders to their customers' summaries.
+
+    Existing summaries are locked and updated in place and missing ones
+    created, a couple of queries however many orders are recorded.
+    """
+    totals = {}
+    for order in orders:
+        count, revenue, first, last = totals.get(order.customer_id, (0, Decimal(0), order.order_date, order.order_date))
+        totals[order.customer_id] = (
+            count + 1, revenue + Decimal(order.total_amount), min(first, order.order_date), max(last, order.order_date),
+        )
+    if not totals:
+        return
+
+    existing = CustomerOrderSummary.objects.select_for_update().in_bulk(list(totals))
+    created = []
+    for customer_id, (count, revenue, first, last) in totals.items():
+        summary = existing.get(customer_id)
+        if summary is None:
+            created.append(CustomerOrderSummary(
+                customer_id=customer_id, order_count=count, lifetime_revenue=revenue,
+                first_order_date=first, last_order_date=last,
+            ))
+            continue
+        summary.order_count += count
+        summary.lifetime_revenue += revenue
+        summary.first_order_date = min(summary.first_order_date, first)
+        summary.last_order_date = max(summary.last_order_date, last)
+
+    CustomerOrderSummary.objects.bulk_update(existing.values(), SUMMARY_FIELDS, batch_size=500)
+    try:
+        with transaction.atomic():
+            CustomerOrderSummary.objects.bulk_create(created, batch_size=500)
+    except IntegrityError:
+        # a concurrent order created one of the rows first
+        refresh_customers([summary.customer_id for summary in created])
+    invalidate(CustomerOrderSummary)
+
+
+@transaction.atomic
+def refresh_customers(customer_ids):
+    """Recompute the summaries of ``customer_ids`` from their orders (after updates or deletes)."""
+    customer_ids = list(customer_ids)
+    summaries = [summary_from_totals(row) for row in order_totals(Order.objects.filter(customer_id__in=customer_ids))]
+    CustomerOrderSummary.objects.filter(customer_id__in=customer_ids).delete()
+    CustomerOrderSummary.objects.bulk_create(summaries, batch_size=500)
+    invalidate(CustomerOrderSummary)
+
+
+@transaction.atomic
+def rebuild(batch_size=2000):
+    """Replace every summary with totals aggregated from the orders table; returns the row count."""
+    CustomerOrderSummary.objects.all().delete()
+    rows = order_totals(Order.objects.all()).iterator(chunk_size=batch_size)
+    count, batch = 0, []
+    for row in rows:
+        batch.append(summary_from_totals(row))
+        if len(batch) == batch_size:
+            CustomerOrderSummary.objects.bulk_create(batch)
+            count, batch = count + len(batch), []
+    CustomerOrderSummary.objects.bulk_create(batch)
+    invalidate(CustomerOrderSummary)
+    return count + len(batch)
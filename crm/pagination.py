@@ -0,0 +1,106 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from graphql import GraphQLError
+
+
+CURSOR_PREFIX = "keyset:"
+
+
+def keyset_ordering(queryset):
+    """
+    Return the queryset ordering as ``[(field, descending), ...]``.
+
+    The primary key is appended as a tie-breaker (in the direction of the
+    last key, so a composite index like ``(order_date, id)`` is scanned in
+    one direction). Only non-null, non-relational model fields can be used.
+    """
+    opts = queryset.model._meta
+    names = queryset.query.order_by or opts.ordering or ["pk"]
+    keys = []
+    for name in names:
+        if not isinstance(name, str) or name == "?":
+            raise GraphQLError("Keyset pagination needs a plain field ordering")
+        descending = name.startswith("-")
+        name = name.lstrip("-")
+        if name in ("pk", opts.pk.name):
+            keys.append(("pk", descending))
+            break
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            raise GraphQLError(f"Keyset pagination can't order by '{name}'")
+        if field.is_relation or field.null:
+            raise GraphQLError(f"Keyset pagination can't order by '{name}'")
+        keys.append((name, descending))
+    else:
+        keys.append(("pk", keys[-1][1] if keys else False))
+    return keys
+
+
+def _field(model, name):
+    return model._meta.pk if name == "pk" else model._meta.get_field(name)
+
+
+def encode_cursor(node, keys):
+    values = [getattr(node, _field(type(node), name).attname) for name, _ in keys]
+    # str() keeps full precision (DjangoJSONEncoder truncates microseconds)
+    payload = json.dumps({"k": [name for name, _ in keys], "v": values}, default=str)
+    return base64.urlsafe_b64encode((CURSOR_PREFIX + payload).encode()).decode()
+
+
+def decode_cursor(cursor, model, keys):
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if not payload.startswith(CURSOR_PREFIX):
+            raise ValueError
+        data = json.loads(payload[len(CURSOR_PREFIX):])
+    except ValueError:
+        raise GraphQLError("Invalid keyset cursor")
+    if data.get("k") != [name for name, _ in keys]:
+        raise GraphQLError("Cursor was issued for a different ordering")
+    try:
+        return [_field(model, name).to_python(value) for (name, _), value in zip(keys, data["v"])]
+    except ValidationError:
+        raise GraphQLError("Invalid keyset cursor")
+
+
+def seek(keys, values, forward=True):
+    """
+    Q object matching rows strictly after (or before) ``values``.
+
+    Expands ``(a, b) > (x, y)`` into ``a >= x AND (a > x OR (a = x AND b > y))``;
+    the leading range lets the database seek on the index for ``a``.
+    """
+    condition = Q()
+    for i, (name, descending) in enumerate(keys):
+        op = "gt" if descending != forward else "lt"
+        equal = {keys[j][0]: values[j] for j in range(i)}
+        condition |= Q(**equal, **{f"{name}__{op}": values[i]})
+    name, descending = keys[0]
+    leading = "gte" if descending != forward else "lte"
+    return Q(**{f"{name}__{leading}": values[0]}) & condition
+
+
+def keyset_page(queryset, limit, after=None, before=None, backward=False):
+    """
+    Fetch one page of ``queryset`` by seeking past a cursor.
+
+    Returns ``(nodes, keys, has_more)`` where ``has_more`` says whether rows
+    exist beyond the page in the paging direction. No COUNT is issued.
+    """
+    keys = keyset_ordering(queryset)
+    if after:
+        queryset = queryset.filter(seek(keys, decode_cursor(after, queryset.model, keys)))
+    if before:
+        queryset = queryset.filter(seek(keys, decode_cursor(before, queryset.model, keys), forward=False))
+
+    ordering = [f"{'-' if descending != backward else ''}{name}" for name, descending in keys]
+    nodes = list(queryset.order_by(*ordering)[:limit + 1])
+    has_more = len(nodes) > limit
+    nodes = nodes[:limit]
+    if backward:
+        nodes.reverse()
+    return nodes, keys, has_more
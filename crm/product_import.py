@@ -0,0 +1,199 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Product
+from .response_cache import invalidate
+from .search import index_objects
+
+DEFAULTS = {
+    # rows validated and upserted per transaction
+    "BATCH_SIZE": 5000,
+    # rejects returned by the importProducts mutation
+    "MAX_REPORTED_REJECTS": 100,
+}
+
+REQUIRED_COLUMNS = ("sku", "name", "price")
+COLUMNS = (*REQUIRED_COLUMNS, "stock")
+
+MAX_SKU_LENGTH = Product._meta.get_field("sku").max_length
+MAX_NAME_LENGTH = Product._meta.get_field("name").max_length
+MAX_PRICE = Decimal(10) ** 8  # max_digits=10, decimal_places=2
+MAX_STOCK = 2147483647
+CENTS = Decimal("0.01")
+# Rows per sku IN (...) lookup
+LOOKUP_SIZE = 500
+
+
+def import_options():
+    return {**DEFAULTS, **getattr(settings, "CRM_PRODUCT_IMPORT", {})}
+
+
+class ImportResult:
+    """Counts of one import, plus the first ``max_rejects`` rejects as ``(line, row, error)``."""
+
+    def __init__(self, max_rejects=0):
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        self.rejects = []
+        self.max_rejects = max_rejects
+
+    def reject(self, line, row, error):
+        self.rejected += 1
+        if len(self.rejects) < self.max_rejects:
+            self.rejects.append((line, row, error))
+
+
+# ---------- Validation ----------
+def text_column(values, label, max_length):
+    """Stripped values and the error of each (None when valid)."""
+    values = [(value or "").strip() for value in values]
+    errors = [
+        f"Missing {label}" if not value
+        else f"{label.capitalize()} is longer than {max_length} characters" if len(value) > max_length
+        else None
+        for value in values
+    ]
+    return values, errors
+
+
+def parse_price(value):
+    try:
+        price = Decimal(value.strip())
+    except (InvalidOperation, AttributeError):
+        return None, "Invalid price"
+    if not price.is_finite() or price <= 0:
+        return None, "Price must be positive"
+    if price != price.quantize(CENTS):
+        return None, "Price has more than 2 decimal places"
+    if price >= MAX_PRICE:
+        return None, f"Price must be below {MAX_PRICE}"
+    return price.quantize(CENTS), None
+
+
+def parse_stock(value):
+    value = (value or "").strip()
+    if not value:
+        return 0, None
+    try:
+        stock = int(value)
+    except ValueError:
+        return None, "Invalid stock"
+    if stock < 0:
+        return None, "Stock cannot be negative"
+    if stock > MAX_STOCK:
+        return None, f"Stock must be at most {MAX_STOCK}"
+    return stock, None
+
+
+def validate_batch(rows):
+    """
+    Validate a batch column by column.
+
+    Returns ``(products, errors)``: an unsaved Product per valid row (None
+    otherwise) and the first error of each row (None when valid).
+    """
+    skus, sku_errors = text_column([row.get("sku") for row in rows], "sku", MAX_SKU_LENGTH)
+    names, name_errors = text_column([row.get("name") for row in rows], "name", MAX_NAME_LENGTH)
+    prices, price_errors = zip(*[parse_price(row.get("price")) for row in rows]) if rows else ((), ())
+    stocks, stock_errors = zip(*[parse_stock(row.get("stock")) for row in rows]) if rows else ((), ())
+
+    errors = [
+        next((error for error in row_errors if error), None)
+        for row_errors in zip(sku_errors, name_errors, price_errors, stock_errors)
+    ]
+    products = [
+        None if error else Product(sku=sku, name=name, price=price, stock=stock)
+        for sku, name, price, stock, error in zip(skus, names, prices, stocks, errors)
+    ]
+    return products, errors
+
+
+# ---------- Upsert ----------
+def upsert(products, update_fields):
+    """
+    Insert or update ``products`` by sku, overwriting ``update_fields`` of
+    existing ones; returns ``(created, updated)``.
+
+    A sku repeated in the batch keeps its last row, matching what loading
+    the rows one by one would leave.
+    """
+    latest = list({product.sku: product for product in products}.values())
+    skus = [product.sku for product in latest]
+    existing = sum(
+        Product.objects.filter(sku__in=skus[start:start + LOOKUP_SIZE]).count()
+        for start in range(0, len(skus), LOOKUP_SIZE)
+    )
+    saved = Product.objects.bulk_create(
+        latest, update_conflicts=True, unique_fields=["sku"], update_fields=update_fields,
+    )
+    if saved and saved[0].pk is None:
+        # backends that can't return ids from an upsert
+        ids = {}
+        for start in range(0, len(skus), LOOKUP_SIZE):
+            ids.update(Product.objects.filter(sku__in=skus[start:start + LOOKUP_SIZE]).values_list("sku", "pk"))
+        for product in saved:
+            product.pk = ids[product.sku]
+    # bulk_create sends no post_save signals
+    index_objects("product", saved)
+    return len(latest) - existing, existing
+
+
+def import_products(file, rejects=None, batch_size=None, max_rejects=0):
+    """
+    Upsert products by sku from a CSV text stream with a header row of
+    ``sku,name,price[,stock]``. Without a stock column, existing products
+    keep their stock (new ones start at 0).
+
+    Rows are read, validated and upserted ``batch_size`` at a time, each
+    batch in its own transaction, so memory stays at one batch. Invalid rows
+    are skipped and written to the ``rejects`` stream (as CSV with their
+    line number and error) when given. Raises ValueError when required
+    columns are missing.
+    """
+    batch_size = batch_size or import_options()["BATCH_SIZE"]
+    reader = csv.DictReader(file)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    update_fields = [column for column in COLUMNS[1:] if column in reader.fieldnames]
+
+    writer = None
+    if rejects is not None:
+        writer = csv.writer(rejects)
+        writer.writerow(["line", "error", *COLUMNS])
+
+    result = ImportResult(max_rejects)
+    batch, lines = [], []
+
+    def flush():
+        products, errors = validate_batch(batch)
+        for line, row, error in zip(lines, batch, errors):
+            if error:
+                result.reject(line, row, error)
+                if writer:
+                    writer.writerow([line, error, *(row.get(column) for column in COLUMNS)])
+        valid = [product for product in products if product is not None]
+        if valid:
+            with transaction.atomic():
+                created, updated = upsert(valid, update_fields)
+            result.created += created
+            result.updated += updated
+
+    try:
+        for row in reader:
+            batch.append(row)
+            lines.append(reader.line_num)
+            if len(batch) == batch_size:
+                flush()
+                batch, lines = [], []
+        if batch:
+            flush()
+    finally:
+        # batches committed before a failure are visible too
+        if result.created or result.updated:
+            invalidate(Product)
+    return result
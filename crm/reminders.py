@@ -0,0 +1,66 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from graphql_relay import to_global_id
+
+from .executor import execute
+from .models import Order
+
+ORDERS_PAGE = """
+query ($since: Date!, $first: Int!, $after: String) {
+  allOrders(orderDate_Gte: $since, keyset: true, first: $first, after: $after, orderBy: ["order_date"]) {
+    pageInfo { hasNextPage endCursor }
+    edges { node { id customer { email } } }
+  }
+}
+"""
+
+
+def recent_orders(since, chunk_size=2000):
+    """
+    Yield ``(order_id, customer_email)`` for orders placed on or after ``since``.
+
+    Rows are streamed from a server-side cursor ``chunk_size`` at a time,
+    so memory doesn't depend on how many orders are in the window.
+    """
+    start = timezone.make_aware(datetime.combine(since, time.min))
+    rows = (
+        Order.objects.filter(order_date__gte=start)
+        .order_by("order_date", "pk")
+        .values_list("pk", "customer__email")
+        .iterator(chunk_size=chunk_size)
+    )
+    for pk, email in rows:
+        yield to_global_id("OrderType", pk), email
+
+
+def recent_orders_paged(since, page_size=100, url=None):
+    """
+    Same as recent_orders(), paging allOrders with keyset cursors.
+
+    For jobs running away from the database (``url`` or
+    ``GRAPHQL_EXECUTOR_URL``); one page is held in memory at a time.
+    """
+    after = None
+    while True:
+        variables = {"since": since.isoformat(), "first": page_size, "after": after}
+        page = execute(ORDERS_PAGE, variables, url=url)["allOrders"]
+        for edge in page["edges"]:
+            yield edge["node"]["id"], edge["node"]["customer"]["email"]
+        if not page["pageInfo"]["hasNextPage"]:
+            return
+        after = page["pageInfo"]["endCursor"]
+
+
+def one_per_customer(orders):
+    """Drop orders of customers that were already reminded (memory ~ customers, not orders)."""
+    seen = set()
+    for order_id, email in orders:
+        if email not in seen:
+            seen.add(email)
+            yield order_id, email
+
+
+def reminders(orders):
+    for order_id, email in one_per_customer(orders):
+        yield f"Order ID: {order_id}, Customer Email: {email}"
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from graphql import TypeInfo, TypeInfoVisitor, Visitor, get_named_type, print_ast, visit
+
+from .documents import DocumentCache
+
+
+class _TypeCollector(Visitor):
+    def __init__(self, type_info):
+        super().__init__()
+        self.type_info = type_info
+        self.type_names = set()
+
+    def enter_field(self, *args):
+        field_type = self.type_info.get_type()
+        if field_type is not None:
+            self.type_names.add(get_named_type(field_type).name)
+
+
+class ResponseCache:
+    """
+    Cache of read-only query results in Django's cache framework.
+
+    Entries are keyed by the normalized document, operation name and
+    variables (filters included), plus a version counter for every model the
+    query reads. Changing a model bumps its version, which orphans exactly
+    the entries that depend on it; they then age out of the backend.
+    """
+
+    prefix = "crm:rc:"
+
+    def __init__(self, alias=None, timeout=None):
+        options = getattr(settings, "GRAPHQL_RESPONSE_CACHE", {})
+        self.alias = alias or options.get("ALIAS", "default")
+        self.timeout = timeout if timeout is not None else options.get("TIMEOUT", 300)
+        self.enabled = options.get("ENABLED", True)
+        self.hits = 0
+        self.misses = 0
+        self._dependencies = DocumentCache(maxsize=256)
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def dependencies(self, schema, document):
+        """
+        Labels (``crm.Order``...) of the models a document selects.
+
+        Model types contribute their model; other object types can list
+        the models they read in a ``cache_models`` attribute.
+        """
+        key = hashlib.sha256(print_ast(document).encode()).hexdigest()
+        labels = self._dependencies.get(key)
+        if labels is None:
+            type_info = TypeInfo(schema)
+            collector = _TypeCollector(type_info)
+            visit(document, TypeInfoVisitor(type_info, collector))
+            labels = set()
+            for name in collector.type_names:
+                graphene_type = getattr(schema.type_map[name], "graphene_type", None)
+                model = getattr(getattr(graphene_type, "_meta", None), "model", None)
+                if model is not None:
+                    labels.add(model._meta.label)
+                labels.update(getattr(graphene_type, "cache_models", ()))
+            labels = tuple(sorted(labels))
+            self._dependencies.set(key, labels)
+        return labels
+
+    def key(self, schema, document, operation_name, variables):
+        labels = self.dependencies(schema, document)
+        versions = self.cache.get_many([self.prefix + "v:" + label for label in labels])
+        payload = json.dumps(
+            [
+                print_ast(document),
+                operation_name,
+                variables or {},
+                [versions.get(self.prefix + "v:" + label, 0) for label in labels],
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return self.prefix + hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        data = self.cache.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.timeout)
+
+    def invalidate(self, *labels):
+        """
+        Bump the versions of the given models.
+
+        Done immediately (so the writing request sees its own change) and
+        again on commit, so a reader can't re-cache pre-commit data under
+        the new version.
+        """
+        def bump():
+            for label in labels:
+                key = self.prefix + "v:" + label
+                if not self.cache.add(key, 1, None):
+                    try:
+                        self.cache.incr(key)
+                    except ValueError:
+                        self.cache.set(key, 1, None)
+            self.cache.set_many({self.prefix + "t:" + label: time.time() for label in labels}, self.timeout)
+
+        bump()
+        transaction.on_commit(bump)
+
+    def changed_within(self, labels, seconds):
+        """True when any of the models ``labels`` was invalidated in the last ``seconds``."""
+        changed = self.cache.get_many([self.prefix + "t:" + label for label in labels])
+        return any(stamp > time.time() - seconds for stamp in changed.values())
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
+
+
+def invalidate(*models):
+    """Invalidate cached responses that read any of ``models``."""
+    response_cache.invalidate(*(model._meta.label for model in models))
@@ -154,14 +154,26 @@
 #         return Order.objects.all()
 
 
+import io
+import json
 import re
+from collections import Counter
 import graphene
 from graphene_django import DjangoObjectType
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
 from django.core.exceptions import ValidationError
-from .models import Customer, Product, Order
-from graphene_django.filter import DjangoFilterConnectionField
+from django.utils import timezone
+from .models import Customer, CustomerOrderSummary, Product, Order, OrderLine
+from graphene_django.settings import graphene_settings
 from .filters import CustomerFilter, ProductFilter, OrderFilter
+from .fields import BatchedFilterConnectionField, CountableConnection
+from .loaders import get_loader
+from .order_summary import record_orders
+from .product_import import import_options, import_products
+from .response_cache import invalidate
+from .search import index_objects, search
+from .stats import CRMStats
 from gql import gql, Client
 from gql.transport.requests import RequestsHTTPTransport
 from crm.models import Product   # ✅ required import
@@ -190,10 +202,20 @@ class OrderType(DjangoObjectType):
 
 
 # ---------- Helper Validators ----------
+PHONE_PATTERN = re.compile(r"^(\+\d{10,15}|\d{3}-\d{3}-\d{4})$")
+
+# Rows per INSERT / IN (...) lookup; keeps well under SQLite's variable limit.
+BULK_BATCH_SIZE = 500
+
+
 def validate_phone(phone: str):
     """Check if phone matches +1234567890 or 123-456-7890 formats"""
-    pattern = r"^(\+\d{10,15}|\d{3}-\d{3}-\d{4})$"
-    return re.match(pattern, phone)
+    return PHONE_PATTERN.match(phone)
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
 # ---------- Create Customer ----------
@@ -237,30 +259,59 @@ class BulkCreateCustomers(graphene.Mutation):
 
     @transaction.atomic
     def mutate(self, info, input):
-        created_customers = []
         errors = []
 
+        rows = []
         for data in input:
             try:
-                data_dict = eval(data) if isinstance(data, str) else data
-                name = data_dict.get("name")
-                email = data_dict.get("email")
-                phone = data_dict.get("phone")
-
-                if Customer.objects.filter(email=email).exists():
-                    raise ValidationError(f"Email already exists: {email}")
-
-                if phone and not validate_phone(phone):
-                    raise ValidationError(f"Invalid phone format for {email}")
-
-                c = Customer(name=name, email=email, phone=phone)
-                c.full_clean()
-                c.save()
-                created_customers.append(c)
-
-            except Exception as e:
-                errors.append(str(e))
-
+                data_dict = json.loads(data) if isinstance(data, str) else data
+            except ValueError as e:
+                errors.append(f"Invalid customer data: {e}")
+                continue
+            if not isinstance(data_dict, dict):
+                errors.append(f"Invalid customer data: {data_dict!r}")
+                continue
+            rows.append(data_dict)
+
+        # One lookup per chunk instead of one exists() query per row
+        emails = [row.get("email") for row in rows if row.get("email")]
+        existing = set()
+        for chunk in chunked(emails, BULK_BATCH_SIZE):
+            existing.update(Customer.objects.filter(email__in=chunk).values_list("email", flat=True))
+
+        seen = set()
+        new_customers = []
+        for row in rows:
+            name = row.get("name")
+            email = row.get("email")
+            phone = row.get("phone")
+
+            if email in existing:
+                errors.append(f"Email already exists: {email}")
+                continue
+            if email in seen:
+                errors.append(f"Duplicate email in input: {email}")
+                continue
+            if phone and not validate_phone(phone):
+                errors.append(f"Invalid phone format for {email}")
+                continue
+
+            c = Customer(name=name, email=email, phone=phone)
+            try:
+                # Uniqueness is already covered by the lookup above
+                c.full_clean(validate_unique=False)
+            except ValidationError as e:
+                errors.append(f"{email}: {'; '.join(e.messages)}")
+                continue
+
+            seen.add(email)
+            new_customers.append(c)
+
+        created_customers = Customer.objects.bulk_create(new_customers, batch_size=BULK_BATCH_SIZE)
+        if created_customers:
+            # bulk_create sends no post_save signals
+            index_objects("customer", created_customers)
+            invalidate(Customer)
         return BulkCreateCustomers(customers=created_customers, errors=errors)
 
 
@@ -270,63 +321,286 @@ class CreateProduct(graphene.Mutation):
         name = graphene.String(required=True)
         price = graphene.Float(required=True)
         stock = graphene.Int(required=False)
+        sku = graphene.String(required=False)
 
     product = graphene.Field(ProductType)
     errors = graphene.List(graphene.String)
 
-    def mutate(self, info, name, price, stock=0):
+    def mutate(self, info, name, price, stock=0, sku=None):
         errors = []
         if price <= 0:
             errors.append("Price must be positive")
         if stock < 0:
             errors.append("Stock cannot be negative")
+        if sku and Product.objects.filter(sku=sku).exists():
+            errors.append("SKU already exists")
 
         if errors:
             return CreateProduct(product=None, errors=errors)
 
-        product = Product(name=name, price=price, stock=stock)
+        product = Product(name=name, price=price, stock=stock, sku=sku or None)
         product.save()
         return CreateProduct(product=product, errors=None)
 
 
+# ---------- Import Products ----------
+class Upload(graphene.Scalar):
+    """A file sent with the request per the GraphQL multipart request spec."""
+
+    @staticmethod
+    def serialize(value):
+        return value
+
+    @staticmethod
+    def parse_value(value):
+        return value
+
+    @staticmethod
+    def parse_literal(node, _variables=None):
+        # files only arrive as variables
+        return None
+
+
+class ProductImportRejectType(graphene.ObjectType):
+    line = graphene.Int()
+    sku = graphene.String()
+    error = graphene.String()
+
+
+class ImportProducts(graphene.Mutation):
+    """
+    Create or update products by sku from an uploaded CSV with a
+    ``sku,name,price[,stock]`` header (crm/product_import.py). Valid rows
+    are upserted in batches and invalid rows skipped; the first rejects are
+    returned. ``manage.py import_products`` imports a file on the server.
+    """
+
+    class Arguments:
+        file = Upload(required=True)
+
+    created = graphene.Int()
+    updated = graphene.Int()
+    rejected = graphene.Int()
+    rejects = graphene.List(ProductImportRejectType)
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, file):
+        if not hasattr(file, "read"):
+            return ImportProducts(errors=["file must be an uploaded file"])
+        stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            result = import_products(stream, max_rejects=import_options()["MAX_REPORTED_REJECTS"])
+        except ValueError as e:
+            return ImportProducts(errors=[str(e)])
+        finally:
+            stream.detach()
+        rejects = [ProductImportRejectType(line=line, sku=row.get("sku"), error=error) for line, row, error in result.rejects]
+        return ImportProducts(
+            created=result.created, updated=result.updated, rejected=result.rejected, rejects=rejects, errors=None,
+        )
+
+
 # ---------- Create Order ----------
+class OrderItemInput(graphene.InputObjectType):
+    product_id = graphene.ID(required=True)
+    quantity = graphene.Int(default_value=1)
+
+
+def order_quantities(product_ids, items):
+    """Product id -> quantity of one order; a product listed twice is ordered twice."""
+    quantities = Counter()
+    try:
+        for product_id in product_ids or []:
+            quantities[int(product_id)] += 1
+        for item in items or []:
+            if item.quantity <= 0:
+                raise ValidationError("Quantity must be positive")
+            quantities[int(item.product_id)] += item.quantity
+    except ValueError:
+        raise ValidationError("One or more product IDs are invalid")
+
+    if not quantities:
+        raise ValidationError("At least one product is required")
+    return quantities
+
+
 class CreateOrder(graphene.Mutation):
     class Arguments:
         customer_id = graphene.ID(required=True)
-        product_ids = graphene.List(graphene.ID, required=True)
+        product_ids = graphene.List(graphene.ID, required=False)  # one unit each
+        items = graphene.List(graphene.NonNull(OrderItemInput), required=False)
         order_date = graphene.DateTime(required=False)
 
     order = graphene.Field(OrderType)
     errors = graphene.List(graphene.String)
 
-    def mutate(self, info, customer_id, product_ids, order_date=None):
+    def mutate(self, info, customer_id, product_ids=None, items=None, order_date=None):
         errors = []
 
         try:
             customer = Customer.objects.get(id=customer_id)
-        except Customer.DoesNotExist:
+        except (Customer.DoesNotExist, ValueError):
             errors.append("Invalid customer ID")
             return CreateOrder(order=None, errors=errors)
 
-        if not product_ids:
-            errors.append("At least one product is required")
-            return CreateOrder(order=None, errors=errors)
+        try:
+            quantities = order_quantities(product_ids, items)
+        except ValidationError as e:
+            return CreateOrder(order=None, errors=e.messages)
 
-        products = Product.objects.filter(id__in=product_ids)
-        if products.count() != len(product_ids):
-            errors.append("One or more product IDs are invalid")
-            return CreateOrder(order=None, errors=errors)
+        try:
+            with transaction.atomic():
+                # Locked so concurrent orders can't both take the last unit
+                products = Product.objects.select_for_update().in_bulk(quantities)
+                if len(products) != len(quantities):
+                    raise ValidationError("One or more product IDs are invalid")
+
+                short = sorted(p.name for pk, p in products.items() if p.stock < quantities[pk])
+                if short:
+                    raise ValidationError(f"Insufficient stock for: {', '.join(short)}")
+
+                # Prices are snapshotted on the lines; the total is summed
+                # from that same snapshot, so it never drifts from them.
+                lines = [
+                    OrderLine(product=products[pk], quantity=quantity, unit_price=products[pk].price)
+                    for pk, quantity in quantities.items()
+                ]
+                order = Order.objects.create(
+                    customer=customer,
+                    order_date=order_date or timezone.now(),
+                    total_amount=sum(line.unit_price * line.quantity for line in lines),
+                )
+                for line in lines:
+                    line.order = order
+                OrderLine.objects.bulk_create(lines)
+
+                Product.objects.filter(pk__in=quantities).update(stock=Case(
+                    *(When(pk=pk, then=F("stock") - quantity) for pk, quantity in quantities.items())
+                ))
+                # Lines and stock bypass save() signals
+                invalidate(OrderLine, Product)
+        except ValidationError as e:
+            return CreateOrder(order=None, errors=e.messages)
+        except IntegrityError:
+            # stock >= 0 check tripped by a concurrent order
+            return CreateOrder(order=None, errors=["Insufficient stock"])
 
-        order = Order(customer=customer, order_date=order_date or None)
-        order.save()
-        order.products.set(products)
+        return CreateOrder(order=order, errors=None)
 
-        # Calculate total
-        total = sum(p.price for p in products)
-        order.total_amount = total
-        order.save()
 
-        return CreateOrder(order=order, errors=None)
+# ---------- Bulk Create Orders ----------
+class BulkOrderInput(graphene.InputObjectType):
+    customer_id = graphene.ID(required=True)
+    product_ids = graphene.List(graphene.ID, required=False)  # one unit each
+    items = graphene.List(graphene.NonNull(OrderItemInput), required=False)
+    order_date = graphene.DateTime(required=False)
+
+
+class BulkCreateOrders(graphene.Mutation):
+    """
+    CreateOrder for many orders at once, e.g. importing order history.
+
+    Customers and products are looked up once per chunk of ids, entries are
+    validated in memory against them, and orders and lines are inserted
+    with chunked bulk_create. Invalid entries are reported as
+    ``Entry <index>: <error>`` and skipped; the valid ones are created.
+    With ``adjustStock: false`` (historic orders) stock is neither checked
+    nor taken.
+    """
+
+    class Arguments:
+        input = graphene.List(graphene.NonNull(BulkOrderInput), required=True)
+        adjust_stock = graphene.Boolean(default_value=True)
+
+    orders = graphene.List(OrderType)
+    errors = graphene.List(graphene.String)
+
+    @transaction.atomic
+    def mutate(self, info, input, adjust_stock=True):
+        errors = []  # (entry index, message)
+
+        entries = []
+        for index, entry in enumerate(input):
+            try:
+                customer_id = int(entry.customer_id)
+            except ValueError:
+                errors.append((index, "Invalid customer ID"))
+                continue
+            try:
+                quantities = order_quantities(entry.product_ids, entry.items)
+            except ValidationError as e:
+                errors.append((index, "; ".join(e.messages)))
+                continue
+            entries.append((index, customer_id, quantities, entry.order_date))
+
+        customer_ids = list({customer_id for _, customer_id, _, _ in entries})
+        customers = set()
+        for chunk in chunked(customer_ids, BULK_BATCH_SIZE):
+            customers.update(Customer.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+
+        # Locked so concurrent orders can't take the same units
+        product_ids = list({pk for _, _, quantities, _ in entries for pk in quantities})
+        products_qs = Product.objects.select_for_update() if adjust_stock else Product.objects.all()
+        products = {}
+        for chunk in chunked(product_ids, BULK_BATCH_SIZE):
+            products.update(products_qs.in_bulk(chunk))
+        remaining = {pk: product.stock for pk, product in products.items()}
+
+        now = timezone.now()
+        orders, order_lines = [], []
+        for index, customer_id, quantities, order_date in entries:
+            if customer_id not in customers:
+                errors.append((index, "Invalid customer ID"))
+                continue
+            if any(pk not in products for pk in quantities):
+                errors.append((index, "One or more product IDs are invalid"))
+                continue
+            if adjust_stock:
+                short = sorted(products[pk].name for pk, quantity in quantities.items() if remaining[pk] < quantity)
+                if short:
+                    errors.append((index, f"Insufficient stock for: {', '.join(short)}"))
+                    continue
+                for pk, quantity in quantities.items():
+                    remaining[pk] -= quantity
+
+            # Same price snapshot and total as CreateOrder
+            lines = [
+                OrderLine(product_id=pk, quantity=quantity, unit_price=products[pk].price)
+                for pk, quantity in quantities.items()
+            ]
+            orders.append(Order(
+                customer_id=customer_id,
+                order_date=order_date or now,
+                total_amount=sum(line.unit_price * line.quantity for line in lines),
+            ))
+            order_lines.append(lines)
+
+        # reported in input order
+        errors = [f"Entry {index}: {message}" for index, message in sorted(errors)]
+        if not orders:
+            return BulkCreateOrders(orders=[], errors=errors)
+
+        Order.objects.bulk_create(orders, batch_size=BULK_BATCH_SIZE)
+        for order, lines in zip(orders, order_lines):
+            for line in lines:
+                line.order = order
+        OrderLine.objects.bulk_create(
+            [line for lines in order_lines for line in lines], batch_size=BULK_BATCH_SIZE
+        )
+
+        if adjust_stock:
+            taken = [(pk, products[pk].stock - stock) for pk, stock in remaining.items() if stock != products[pk].stock]
+            for chunk in chunked(taken, BULK_BATCH_SIZE):
+                Product.objects.filter(pk__in=[pk for pk, _ in chunk]).update(stock=Case(
+                    *(When(pk=pk, then=F("stock") - quantity) for pk, quantity in chunk)
+                ))
+
+        # bulk_create and update() send no signals
+        record_orders(orders)
+        invalidate(Order, OrderLine, Product)
+        # siblings, so customer and lines load once for the whole payload
+        get_loader(info).register(orders)
+        return BulkCreateOrders(orders=orders, errors=errors)
 
 
 # ---------- Root Mutation ----------
@@ -356,40 +630,169 @@ class Query(graphene.ObjectType):
 
 
 # ---------- GraphQL Types ----------
+# Relations resolve through the request loader so a page of nodes costs one
+# query per relation instead of one per node (see crm/loaders.py).
+class CustomerOrderSummaryType(DjangoObjectType):
+    class Meta:
+        model = CustomerOrderSummary
+        fields = ("order_count", "lifetime_revenue", "first_order_date", "last_order_date")
+
+
 class CustomerType(DjangoObjectType):
+    # Customer queries may filter or sort on the summary without selecting it
+    cache_models = ("crm.CustomerOrderSummary",)
+
+    orders = BatchedFilterConnectionField(lambda: OrderType)
+    order_summary = graphene.Field(CustomerOrderSummaryType, description="Null until the first order")
+
     class Meta:
         model = Customer
         filterset_class = CustomerFilter
         interfaces = (graphene.relay.Node,)
+        connection_class = CountableConnection
+
+    def resolve_orders(self, info, **kwargs):
+        return get_loader(info).load_many(self, "orders", kwargs)
+
+    def resolve_order_summary(self, info):
+        return get_loader(info).load(self, "order_summary")
 
 
 class ProductType(DjangoObjectType):
+    orders = BatchedFilterConnectionField(lambda: OrderType)
+
     class Meta:
         model = Product
         filterset_class = ProductFilter
         interfaces = (graphene.relay.Node,)
+        connection_class = CountableConnection
+
+    def resolve_orders(self, info, **kwargs):
+        return get_loader(info).load_many(self, "orders", kwargs)
+
+    def resolve_order_lines(self, info):
+        return get_loader(info).load_many(self, "order_lines")
 
 
 class OrderType(DjangoObjectType):
+    products = BatchedFilterConnectionField(ProductType)
+
     class Meta:
         model = Order
         filterset_class = OrderFilter
         interfaces = (graphene.relay.Node,)
+        connection_class = CountableConnection
+
+    def resolve_customer(self, info):
+        return get_loader(info).load(self, "customer")
+
+    def resolve_products(self, info, **kwargs):
+        return get_loader(info).load_many(self, "products", kwargs)
+
+    def resolve_lines(self, info):
+        return get_loader(info).load_many(self, "lines")
+
+
+class OrderLineType(DjangoObjectType):
+    class Meta:
+        model = OrderLine
+        fields = ("id", "order", "product", "quantity", "unit_price")
+
+    def resolve_order(self, info):
+        return get_loader(info).load(self, "order")
+
+    def resolve_product(self, info):
+        return get_loader(info).load(self, "product")
+
+
+# ---------- Reports ----------
+class StatsPeriod(graphene.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class PeriodStatsType(graphene.ObjectType):
+    period = graphene.Date(description="First day of the day/week/month")
+    order_count = graphene.Int()
+    revenue = graphene.Decimal()
+
+
+class CRMStatsType(graphene.ObjectType):
+    # Not a model type, so name the models the response cache should track
+    cache_models = ("crm.Customer", "crm.Order")
+
+    customer_count = graphene.Int()
+    order_count = graphene.Int()
+    revenue = graphene.Decimal()
+    periods = graphene.List(graphene.NonNull(PeriodStatsType))
+
+
+# ---------- Search ----------
+class SearchKind(graphene.Enum):
+    PRODUCT = "product"
+    CUSTOMER = "customer"
+
+
+class SearchResult(graphene.Union):
+    class Meta:
+        types = (ProductType, CustomerType)
+
+
+class SearchHitType(graphene.ObjectType):
+    # nodes are only typed through fragments, so name the models read
+    cache_models = ("crm.Product", "crm.Customer")
+
+    kind = SearchKind()
+    score = graphene.Float(description="Relevance; higher is better")
+    node = graphene.Field(SearchResult)
 
 
 # ---------- Query ----------
+# allCustomers sort keys over CustomerOrderSummary columns; customers without
+# orders sort as having none.
+CUSTOMER_SUMMARY_ORDERING = ("order_count", "lifetime_revenue", "first_order_date", "last_order_date")
+
+
+def customer_ordering(order_by):
+    for name in order_by:
+        key = name.lstrip("-")
+        if key not in CUSTOMER_SUMMARY_ORDERING:
+            yield name
+        elif name.startswith("-"):
+            yield F(f"order_summary__{key}").desc(nulls_last=True)
+        else:
+            yield F(f"order_summary__{key}").asc(nulls_first=True)
+
+
 class Query(graphene.ObjectType):
     hello = graphene.String(default_value="Hello, GraphQL!")
 
     # Filtered lists
-    all_customers = DjangoFilterConnectionField(CustomerType, order_by=graphene.List(of_type=graphene.String))
-    all_products = DjangoFilterConnectionField(ProductType, order_by=graphene.List(of_type=graphene.String))
-    all_orders = DjangoFilterConnectionField(OrderType, order_by=graphene.List(of_type=graphene.String))
+    all_customers = BatchedFilterConnectionField(CustomerType, order_by=graphene.List(of_type=graphene.String), keyset=True)
+    all_products = BatchedFilterConnectionField(ProductType, order_by=graphene.List(of_type=graphene.String), keyset=True)
+    all_orders = BatchedFilterConnectionField(OrderType, order_by=graphene.List(of_type=graphene.String), keyset=True)
+
+    # Ranked word-prefix search over product and customer names (crm/search.py)
+    search = graphene.List(
+        graphene.NonNull(SearchHitType),
+        query=graphene.String(required=True),
+        first=graphene.Int(default_value=20),
+        kinds=graphene.List(graphene.NonNull(SearchKind)),
+    )
+
+    # Aggregates for reports; constant-size regardless of table size
+    crm_stats = graphene.Field(
+        CRMStatsType,
+        start_date=graphene.Date(),
+        end_date=graphene.Date(),
+        group_by=StatsPeriod(),
+    )
 
     def resolve_all_customers(root, info, order_by=None, **kwargs):
         qs = Customer.objects.all()
         if order_by:
-            qs = qs.order_by(*order_by)
+            qs = qs.order_by(*customer_ordering(order_by))
         return qs
 
     def resolve_all_products(root, info, order_by=None, **kwargs):
@@ -403,31 +806,47 @@ class Query(graphene.ObjectType):
         if order_by:
             qs = qs.order_by(*order_by)
         return qs
-    
-class ProductType(graphene.ObjectType):
-    id = graphene.ID()
-    name = graphene.String()
-    stock = graphene.Int()
+
+    def resolve_crm_stats(root, info, start_date=None, end_date=None, group_by=None):
+        return CRMStats(start_date, end_date, group_by.value if group_by else None)
+
+    def resolve_search(root, info, query, first=20, kinds=None):
+        limit = min(max(first, 0), graphene_settings.RELAY_CONNECTION_MAX_LIMIT or 100)
+        hits = search(query, [kind.value for kind in kinds] if kinds else None, limit)
+        return [SearchHitType(kind=kind, score=score, node=node) for kind, score, node in hits]
+
 
 class UpdateLowStockProducts(graphene.Mutation):
     class Arguments:
-        pass  # no arguments needed
+        threshold = graphene.Int(default_value=10)
+        amount = graphene.Int(default_value=10)
 
     updated_products = graphene.List(ProductType)
     message = graphene.String()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, threshold=10, amount=10):
+        if amount <= 0:
+            return UpdateLowStockProducts(
+                updated_products=[], message="No products updated.", errors=["Amount must be positive"]
+            )
 
-    def mutate(self, info):
-        low_stock_products = Product.objects.filter(stock__lt=10)
-        updated = []
-        for product in low_stock_products:
-            product.stock += 10  # simulate restocking
-            product.save()
-            updated.append(product)
+        # One UPDATE for the whole catalog instead of a save() per product
+        updated = Product.objects.restock(threshold, amount)
+        if updated:
+            invalidate(Product)
 
         return UpdateLowStockProducts(
             updated_products=updated,
-            message="Low stock products successfully updated."
+            message="Low stock products successfully updated.",
+            errors=None,
         )
 
 class Mutation(graphene.ObjectType):
+    create_customer = CreateCustomer.Field()
+    bulk_create_customers = BulkCreateCustomers.Field()
+    create_product = CreateProduct.Field()
+    import_products = ImportProducts.Field()
+    create_order = CreateOrder.Field()
+    bulk_create_orders = BulkCreateOrders.Field()
     update_low_stock_products = UpdateLowStockProducts.Field()
@@ -0,0 +1,316 @@
+import re
+import unicodedata
+
+from django.apps import apps
+from django.conf import settings
+from django.db import OperationalError, connections, router
+from django.db.models.expressions import RawSQL
+
+from .response_cache import invalidate
+
+DEFAULTS = {
+    # "fts5", "tokens", or "auto": FTS5 when the database has the FTS tables
+    "BACKEND": "auto",
+    # route the name/email filters through the index instead of icontains
+    "FILTERS": False,
+}
+
+# kind -> (model label, indexed fields)
+INDEXED = {
+    "product": ("crm.Product", ("name",)),
+    "customer": ("crm.Customer", ("name", "email")),
+}
+
+MAX_TOKEN_LENGTH = 64
+# letters and digits; punctuation and "_" separate tokens, as in FTS5's unicode61
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+CHUNK_SIZE = 500
+
+
+def search_options():
+    return {**DEFAULTS, **getattr(settings, "CRM_SEARCH", {})}
+
+
+def tokenize(text):
+    """Lowercase word tokens with diacritics removed."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(text)]
+
+
+def query_terms(query):
+    """
+    Distinct prefix terms of a search query, longest first.
+
+    Terms that prefix another term are dropped ("lap laptop" searches
+    "laptop"), so every index token matches at most one term.
+    """
+    terms = sorted(set(tokenize(query)), key=len, reverse=True)
+    kept = []
+    for term in terms:
+        if not any(other.startswith(term) for other in kept):
+            kept.append(term)
+    return kept
+
+
+def model_for(kind):
+    return apps.get_model(INDEXED[kind][0])
+
+
+def chunked(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class FTS5Index:
+    """
+    SQLite FTS5 tables, one per kind (``crm_product_fts``...), with the
+    object's primary key as rowid and one column per indexed field.
+    Matches are prefix matches on every term, ranked by bm25.
+    """
+
+    name = "fts5"
+
+    def table(self, kind):
+        return f"crm_{kind}_fts"
+
+    def create_tables(self, schema_editor):
+        for kind, (_, fields) in INDEXED.items():
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table(kind)} "
+                f"USING fts5({', '.join(fields)}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def drop_tables(self, schema_editor):
+        for kind in INDEXED:
+            schema_editor.execute(f"DROP TABLE IF EXISTS {self.table(kind)}")
+
+    def index(self, kind, objects, using):
+        fields = INDEXED[kind][1]
+        rows = [(obj.pk, *(getattr(obj, field) or "" for field in fields)) for obj in objects]
+        self.remove(kind, [row[0] for row in rows], using)
+        placeholders = ", ".join(["%s"] * (len(fields) + 1))
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table(kind)} (rowid, {', '.join(fields)}) VALUES ({placeholders})", rows
+            )
+
+    def remove(self, kind, ids, using):
+        with connections[using].cursor() as cursor:
+            for chunk in chunked(ids):
+                cursor.execute(
+                    f"DELETE FROM {self.table(kind)} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk
+                )
+
+    def clear(self, kind, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table(kind)}")
+
+    def match(self, terms, field=None):
+        expression = " AND ".join(f'"{term}"*' for term in terms)
+        return f"{field} : ({expression})" if field else expression
+
+    def ids_sql(self, kind, terms, using, field=None):
+        table = self.table(kind)
+        return f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [self.match(terms, field)]
+
+    def search(self, kind, terms, limit, using):
+        table = self.table(kind)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -rank FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s",
+                [self.match(terms), limit],
+            )
+            return cursor.fetchall()
+
+
+class TokenIndex:
+    """
+    Portable inverted index: one SearchToken row per distinct (field, token)
+    of an object, tokenized in Python. A term matches tokens it prefixes
+    (an index range scan); objects must match every term and rank by exact
+    matches (2) over prefix matches (1) per term.
+    """
+
+    name = "tokens"
+
+    def __init__(self, model=None):
+        # migrations pass their historical SearchToken
+        self.model = model or apps.get_model("crm", "SearchToken")
+
+    def index(self, kind, objects, using):
+        objects = list(objects)
+        self.remove(kind, [obj.pk for obj in objects], using)
+        tokens = [
+            self.model(kind=kind, object_id=obj.pk, field=field, token=token)
+            for obj in objects
+            for field in INDEXED[kind][1]
+            for token in dict.fromkeys(tokenize(getattr(obj, field)))
+        ]
+        self.model.objects.using(using).bulk_create(tokens, batch_size=CHUNK_SIZE)
+
+    def remove(self, kind, ids, using):
+        for chunk in chunked(ids):
+            self.model.objects.using(using).filter(kind=kind, object_id__in=chunk)._raw_delete(using)
+
+    def clear(self, kind, using):
+        self.model.objects.using(using).filter(kind=kind)._raw_delete(using)
+
+    @staticmethod
+    def bounds(term):
+        # [term, successor of term) holds exactly the tokens it prefixes
+        return [term, term[:-1] + chr(ord(term[-1]) + 1)]
+
+    def plan(self, kind, terms, field, table):
+        """
+        FROM/WHERE clause driven by the longest (usually rarest) term, and
+        one correlated index lookup per other term giving its weight (exact
+        match 2, prefix 1, NULL when the object lacks the term).
+        """
+        driver, *others = terms
+        field_sql = " AND field = %s" if field else ""
+        field_params = [field] if field else []
+        where = f"FROM {table} d WHERE d.kind = %s{field_sql} AND d.token >= %s AND d.token < %s"
+        where_params = [kind, *field_params, *self.bounds(driver)]
+        weights, weight_params = [], []
+        for term in others:
+            weights.append(
+                f"(SELECT MAX(CASE WHEN token = %s THEN 2 ELSE 1 END) FROM {table} "
+                f"WHERE kind = d.kind AND object_id = d.object_id{field_sql} AND token >= %s AND token < %s)"
+            )
+            weight_params += [term, *field_params, *self.bounds(term)]
+        return where, where_params, weights, weight_params
+
+    def ids_sql(self, kind, terms, using, field=None):
+        table = connections[using].ops.quote_name(self.model._meta.db_table)
+        where, params, weights, weight_params = self.plan(kind, terms, field, table)
+        conditions = "".join(f" AND {weight} IS NOT NULL" for weight in weights)
+        return f"SELECT d.object_id {where}{conditions}", [*params, *weight_params]
+
+    def search(self, kind, terms, limit, using):
+        connection = connections[using]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        where, params, weights, weight_params = self.plan(kind, terms, None, table)
+        score = " + ".join(["MAX(CASE WHEN d.token = %s THEN 2 ELSE 1 END)", *weights])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT object_id, score FROM (SELECT d.object_id, {score} AS score {where} GROUP BY d.object_id) hits "
+                f"WHERE score IS NOT NULL ORDER BY score DESC, object_id LIMIT %s",
+                [terms[0], *weight_params, *params, limit],
+            )
+            return cursor.fetchall()
+
+
+BACKENDS = {"fts5": FTS5Index, "tokens": TokenIndex}
+_fts5_databases = {}
+
+
+def has_fts5_tables(connection):
+    key = (connection.alias, connection.settings_dict["NAME"])
+    if key not in _fts5_databases:
+        tables = set()
+        if connection.vendor == "sqlite":
+            tables = set(connection.introspection.table_names(include_views=False))
+            # virtual tables aren't always listed by introspection
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'crm_%_fts'")
+                tables.update(name for name, in cursor.fetchall())
+        _fts5_databases[key] = all(FTS5Index().table(kind) in tables for kind in INDEXED)
+    return _fts5_databases[key]
+
+
+def search_index(using="default"):
+    backend = search_options()["BACKEND"]
+    if backend == "auto":
+        backend = "fts5" if has_fts5_tables(connections[using]) else "tokens"
+    return BACKENDS[backend]()
+
+
+def fts5_supported(connection):
+    if connection.vendor != "sqlite":
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE temp.crm_fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.crm_fts5_probe")
+    except OperationalError:
+        return False
+    return True
+
+
+# ---------- Sync ----------
+def index_objects(kind, objects):
+    """(Re)index saved objects of ``kind``; called from signals and bulk paths."""
+    objects = list(objects)
+    if objects:
+        using = router.db_for_write(model_for(kind))
+        search_index(using).index(kind, objects, using)
+
+
+def remove_objects(kind, ids):
+    ids = list(ids)
+    if ids:
+        using = router.db_for_write(model_for(kind))
+        search_index(using).remove(kind, ids, using)
+
+
+def rebuild(kind, batch_size=2000):
+    """Reindex every object of ``kind``; returns the count."""
+    model = model_for(kind)
+    using = router.db_for_write(model)
+    index = search_index(using)
+    index.clear(kind, using)
+    count, batch = 0, []
+    for obj in model.objects.using(using).only("pk", *INDEXED[kind][1]).iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) == batch_size:
+            index.index(kind, batch, using)
+            count, batch = count + len(batch), []
+    index.index(kind, batch, using)
+    # cached search results and routed filters read the index
+    invalidate(model)
+    return count + len(batch)
+
+
+# ---------- Queries ----------
+def matching(kind, query, using, field=None):
+    """
+    Expression for ``pk__in`` selecting objects of ``kind`` matching every
+    term of ``query`` (in ``field`` only, when given) in the index of the
+    ``using`` database. None when the query has no terms.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return None
+    sql, params = search_index(using).ids_sql(kind, terms, using, field)
+    return RawSQL(sql, params)
+
+
+def filter_matching(queryset, kind, query, field=None, lookup="pk"):
+    """Filter ``queryset`` to rows whose ``lookup`` is a matching object of ``kind``."""
+    # the subquery runs on the queryset's database, so use that one's index
+    ids = matching(kind, query, queryset.db, field)
+    if ids is None:
+        return queryset.none()
+    return queryset.filter(**{f"{lookup}__in": ids})
+
+
+def search(query, kinds=None, limit=20):
+    """Best ``limit`` matches across ``kinds`` as ``[(kind, score, instance)]``, best first."""
+    terms = query_terms(query)
+    if not terms or limit <= 0:
+        return []
+    hits = []
+    for kind in kinds or INDEXED:
+        # detect the backend on the database the search then runs on
+        using = router.db_for_read(model_for(kind))
+        hits += [(score, kind, pk) for pk, score in search_index(using).search(kind, terms, limit, using)]
+    hits.sort(key=lambda hit: -hit[0])
+    hits = hits[:limit]
+
+    objects = {}
+    for kind in {kind for _, kind, _ in hits}:
+        objects[kind] = model_for(kind).objects.in_bulk([pk for _, hit_kind, pk in hits if hit_kind == kind])
+    # rows deleted since they were indexed are skipped
+    return [(kind, score, objects[kind][pk]) for score, kind, pk in hits if pk in objects[kind]]
@@ -0,0 +1,106 @@
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from .models import Customer, Order, OrderLine, Product
+from .order_summary import record_orders, refresh_customers
+from .response_cache import invalidate
+from .search import INDEXED, index_objects, remove_objects
+
+# post_delete receivers per sender, as (receiver, dispatch_uid), for
+# delete_receivers_disconnected()
+DELETE_RECEIVERS = defaultdict(list)
+
+
+def connect_delete(receiver, sender, dispatch_uid):
+    post_delete.connect(receiver, sender=sender, dispatch_uid=dispatch_uid)
+    DELETE_RECEIVERS[sender].append((receiver, dispatch_uid))
+
+
+# Models whose cached responses go stale when the sender changes. Order
+# lines are read from both the order and the product side.
+AFFECTED_MODELS = {
+    Customer: (Customer,),
+    Product: (Product,),
+    Order: (Order,),
+    OrderLine: (OrderLine, Order, Product),
+}
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate(*AFFECTED_MODELS[sender])
+
+
+def invalidate_order_products(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate(*AFFECTED_MODELS[OrderLine])
+
+
+for model in AFFECTED_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"crm-rc-save-{model.__name__}")
+    connect_delete(invalidate_cached_responses, model, f"crm-rc-delete-{model.__name__}")
+m2m_changed.connect(invalidate_order_products, sender=Order.products.through, dispatch_uid="crm-rc-order-products")
+
+
+# Customer order summaries; bulk order paths call record_orders() themselves.
+def remember_order_customer(sender, instance, update_fields=None, **kwargs):
+    """Note the stored customer of an updated order, whose summary loses it if it moves."""
+    instance._previous_customer_id = None
+    if instance._state.adding or (update_fields is not None and "customer" not in update_fields):
+        return
+    instance._previous_customer_id = (
+        Order.objects.using(instance._state.db).filter(pk=instance.pk).values_list("customer_id", flat=True).first()
+    )
+
+
+def update_order_summary(sender, instance, created=False, **kwargs):
+    if created:
+        record_orders([instance])
+    else:
+        previous = getattr(instance, "_previous_customer_id", None)
+        refresh_customers({instance.customer_id, previous} - {None})
+
+
+pre_save.connect(remember_order_customer, sender=Order, dispatch_uid="crm-summary-presave-order")
+post_save.connect(update_order_summary, sender=Order, dispatch_uid="crm-summary-save-order")
+connect_delete(update_order_summary, Order, "crm-summary-delete-order")
+
+
+# Search index (crm/search.py); bulk paths index or remove rows themselves.
+SEARCH_KINDS = {Product: "product", Customer: "customer"}
+
+
+def index_for_search(sender, instance, update_fields=None, **kwargs):
+    kind = SEARCH_KINDS[sender]
+    if update_fields is None or set(update_fields) & set(INDEXED[kind][1]):
+        index_objects(kind, [instance])
+
+
+def remove_from_search(sender, instance, **kwargs):
+    remove_objects(SEARCH_KINDS[sender], [instance.pk])
+
+
+for model in SEARCH_KINDS:
+    post_save.connect(index_for_search, sender=model, dispatch_uid=f"crm-search-save-{model.__name__}")
+    connect_delete(remove_from_search, model, f"crm-search-delete-{model.__name__}")
+
+
+@contextmanager
+def delete_receivers_disconnected(*models):
+    """
+    Disconnect the post_delete receivers above for ``models`` in the block.
+
+    With no receivers, ``delete()`` cascades with set-based queries instead
+    of loading and signalling every row, so the caller must invalidate the
+    response cache, order summaries and search index itself. Receivers are
+    process-wide: only for bulk jobs running in their own process.
+    """
+    disconnected = [(receiver, model, uid) for model in models for receiver, uid in DELETE_RECEIVERS[model]]
+    for receiver, model, uid in disconnected:
+        post_delete.disconnect(receiver, sender=model, dispatch_uid=uid)
+    try:
+        yield
+    finally:
+        for receiver, model, uid in disconnected:
+            post_delete.connect(receiver, sender=model, dispatch_uid=uid)
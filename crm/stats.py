@@ -0,0 +1,84 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import cached_property
+
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import Customer, Order
+
+PERIODS = ("day", "week", "month")
+CENTS = Decimal("0.01")
+
+
+def date_bounds(start_date=None, end_date=None):
+    """
+    Aware datetimes ``[start, end)`` for an inclusive date range.
+
+    Filtering on the raw column (rather than ``__date``) keeps the
+    ``order_date`` / ``created_at`` indexes usable.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz) if start_date else None
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz) if end_date else None
+    return start, end
+
+
+def in_range(queryset, field, start=None, end=None):
+    if start is not None:
+        queryset = queryset.filter(**{f"{field}__gte": start})
+    if end is not None:
+        queryset = queryset.filter(**{f"{field}__lt": end})
+    return queryset
+
+
+class CRMStats:
+    """
+    Customer/order counts and revenue computed with database aggregates.
+
+    Each figure is one aggregate query, run only if it is read, so the
+    cost and payload don't grow with the tables. Orders are ranged on
+    ``order_date`` and customers on ``created_at``.
+    """
+
+    def __init__(self, start_date=None, end_date=None, group_by=None):
+        if group_by is not None and group_by not in PERIODS:
+            raise ValueError(f"group_by must be one of {', '.join(PERIODS)}")
+        self.start, self.end = date_bounds(start_date, end_date)
+        self.group_by = group_by
+
+    @property
+    def orders(self):
+        return in_range(Order.objects.all(), "order_date", self.start, self.end)
+
+    @cached_property
+    def customer_count(self):
+        return in_range(Customer.objects.all(), "created_at", self.start, self.end).count()
+
+    @cached_property
+    def _totals(self):
+        return self.orders.aggregate(order_count=Count("id"), revenue=Sum("total_amount", default=0))
+
+    @property
+    def order_count(self):
+        return self._totals["order_count"]
+
+    @property
+    def revenue(self):
+        # SQLite sums decimals without their scale
+        return self._totals["revenue"].quantize(CENTS)
+
+    @cached_property
+    def periods(self):
+        """Order count and revenue per day/week/month, oldest first."""
+        if self.group_by is None:
+            return []
+        rows = (
+            self.orders
+            .annotate(period=Trunc("order_date", self.group_by, output_field=DateField()))
+            .values("period")
+            .annotate(order_count=Count("id"), revenue=Sum("total_amount"))
+            .order_by("period")
+        )
+        return [{**row, "revenue": row["revenue"].quantize(CENTS)} for row in rows]
@@ -1,49 +1,115 @@
-import requests
 import logging
 from datetime import datetime
-from celery import shared_task
+from decimal import Decimal
+
+from celery import chord, shared_task
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+
+from crm.db_routing import reading_from, replica_alias
+from crm.models import Customer, Order
+from crm.stats import CENTS
 
 logger = logging.getLogger(__name__)
 
-GRAPHQL_ENDPOINT = "http://localhost:8000/graphql/"
+DEFAULTS = {
+    # orders (by id) each aggregate_orders task sums; fewer, larger
+    # partitions cost less overhead, more of them spread over more workers
+    "PARTITION_SIZE": 100_000,
+    "LOG_FILE": "/tmp/crm_report_log.txt",
+}
 
-@shared_task
-def generate_crm_report():
-    query = """
-    query {
-        customers {
-            id
-        }
-        orders {
-            id
-            totalAmount
-        }
-    }
+
+def report_options():
+    return {**DEFAULTS, **getattr(settings, "CRM_REPORT", {})}
+
+
+def write_log(line):
+    with open(report_options()["LOG_FILE"], "a") as log_file:
+        log_file.write(line + "\n")
+
+
+def order_partitions(partition_size):
     """
+    Inclusive ``(first_id, last_id)`` ranges of ``partition_size`` orders
+    each, covering every order.
 
-    try:
-        response = requests.post(GRAPHQL_ENDPOINT, json={"query": query})
-        response.raise_for_status()
-        data = response.json().get("data", {})
+    Boundaries are stepped through the existing ids (one primary key index
+    seek per partition), so gaps left by deleted orders don't produce empty
+    partitions.
+    """
+    ids = Order.objects.order_by("id").values_list("id", flat=True)
+    last = Order.objects.aggregate(last=Max("id"))["last"]
+    partitions = []
+    first = ids.first()
+    while first is not None:
+        following = ids.filter(id__gte=first)[partition_size:partition_size + 1].first()
+        partitions.append((first, last if following is None else following - 1))
+        first = following
+    return partitions
 
-        customers = data.get("customers", [])
-        orders = data.get("orders", [])
 
-        total_customers = len(customers)
-        total_orders = len(orders)
-        total_revenue = sum(order.get("totalAmount", 0) for order in orders)
+def report_chord(partition_size=None):
+    """
+    The report as a chord: an ``aggregate_orders`` task per id range of
+    orders, reduced by ``write_crm_report``.
 
-        # Format log entry
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        report = f"{timestamp} - Report: {total_customers} customers, {total_orders} orders, {total_revenue} revenue"
+    Outside eager mode a chord needs a result backend (CELERY_RESULT_BACKEND).
+    """
+    partition_size = partition_size or report_options()["PARTITION_SIZE"]
+    with reading_from(replica_alias()):
+        partitions = order_partitions(partition_size)
+    return chord(
+        (aggregate_orders.s(first, last) for first, last in partitions),
+        write_crm_report.s().on_error(report_failed.s()),
+    )
 
-        # Write to log file
-        with open("/tmp/crm_report_log.txt", "a") as log_file:
-            log_file.write(report + "\n")
 
-        logger.info("CRM Report generated successfully: %s", report)
+# ---------- Tasks ----------
+@shared_task
+def aggregate_orders(first_id, last_id):
+    """Order count and revenue of the orders with ids in ``[first_id, last_id]``."""
+    # a range on the primary key, so each partition reads only its own rows
+    with reading_from(replica_alias()):
+        totals = Order.objects.filter(id__gte=first_id, id__lte=last_id).aggregate(
+            order_count=Count("id"), revenue=Sum("total_amount", default=0),
+        )
+    # strings survive any serializer
+    return {"order_count": totals["order_count"], "revenue": str(totals["revenue"])}
 
+
+@shared_task
+def write_crm_report(partials):
+    """Reduce the partition totals into the report line and log it."""
+    with reading_from(replica_alias()):
+        total_customers = Customer.objects.count()
+    total_orders = sum(partial["order_count"] for partial in partials)
+    # SQLite sums decimals without their scale
+    total_revenue = sum((Decimal(partial["revenue"]) for partial in partials), Decimal(0)).quantize(CENTS)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    report = f"{timestamp} - Report: {total_customers} customers, {total_orders} orders, {total_revenue} revenue"
+    write_log(report)
+    logger.info("CRM Report generated successfully: %s", report)
+    return report
+
+
+@shared_task
+def report_failed(request, exc, traceback):
+    logger.error("Failed to generate CRM report: %s", exc)
+    write_log(f"{datetime.now()} - ERROR: {exc}")
+
+
+@shared_task
+def generate_crm_report(partition_size=None):
+    """
+    Fan the report out over the workers: orders are split into id ranges of
+    ``partition_size`` (CRM_REPORT["PARTITION_SIZE"]) aggregated in parallel,
+    then summed into the log line.
+    """
+    try:
+        report_chord(partition_size).apply_async()
     except Exception as e:
+        # in eager mode a failing partition raises here
         logger.error("Failed to generate CRM report: %s", str(e))
-        with open("/tmp/crm_report_log.txt", "a") as log_file:
-            log_file.write(f"{datetime.now()} - ERROR: {str(e)}\n")
+        write_log(f"{datetime.now()} - ERROR: {str(e)}")
@@ -1,3 +1,438 @@
-from django.shortcuts import render
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBadRequest
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from django.views.decorators.http import require_GET
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError
+from graphene_django.utils.utils import set_rollback
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast, specified_rules, validate_schema
+
+from .batching import SKIPPED, batch_options, payload_errors
+from .complexity import QueryCostRule, cost_options, estimate_cost
+from .db_routing import mark_written, pin_response, read_alias, reading_from, routing_options
+from .documents import PersistedQueryNotFound, document_cache, persisted_queries
+from .exports import EXPORTS, FORMATS, export_queryset, stream
+from .instrumentation import InstrumentationMiddleware, Trace, instrumentation_options, metrics
+from .response_cache import response_cache
+
+
+class CRMGraphQLView(GraphQLView):
+    """
+    GraphQLView with persisted queries and a parsed-document cache.
+
+    Clients may send ``extensions.persistedQuery.sha256Hash`` instead of the
+    query text (automatic persisted queries); unknown hashes answer
+    ``PersistedQueryNotFound`` so the client can retry with the full query,
+    which registers it. Parsed and validated documents are kept in an LRU
+    so repeated queries skip parse and validate entirely, and results of
+    query operations are served from the response cache
+    (crm/response_cache.py). Operations over the cost/depth budget are
+    rejected during validation (crm/complexity.py); the estimated cost is
+    reported in the response ``extensions``. Resolver and SQL timings feed
+    the metrics registry (crm/instrumentation.py) and are returned in
+    ``extensions.timing`` when the debug header is sent.
+
+    A JSON array of operations is executed as a batch (crm/batching.py):
+    every operation shares the request, and with it the relation loader
+    and caches, and answers in a matching array with its ``id`` and
+    ``status``. Batches sent with the atomic header run in one transaction
+    that is rolled back, skipping the rest, as soon as an operation fails.
+    Multipart requests carry file uploads (``Upload`` variables).
+    """
+
+    validation_rules = (*specified_rules, QueryCostRule)
+
+    def dispatch(self, request, *args, **kwargs):
+        header = batch_options()["ATOMIC_HEADER"]
+        if request.method.lower() != "post" or not request.headers.get(header):
+            return pin_response(request, super().dispatch(request, *args, **kwargs))
+
+        request.graphql_batch_failed = False
+        with transaction.atomic():
+            response = super().dispatch(request, *args, **kwargs)
+            if request.graphql_batch_failed:
+                transaction.set_rollback(True)
+        if request.graphql_batch_failed:
+            response["X-GraphQL-Batch-Rolled-Back"] = "true"
+        return pin_response(request, response)
+
+    def parse_body(self, request):
+        content_type = self.get_content_type(request)
+        if content_type == "multipart/form-data" and "operations" in request.POST:
+            return self.parse_multipart(request)
+        # A JSON array is a batch, whatever the view's ``batch`` flag says
+        if content_type != "application/json" or request.body.lstrip()[:1] != b"[":
+            return super().parse_body(request)
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+        except ValueError:
+            raise HttpError(HttpResponseBadRequest("POST body sent invalid JSON."))
+        return self.parse_batch(data)
+
+    def parse_multipart(self, request):
+        """
+        File uploads per the GraphQL multipart request spec: ``operations``
+        holds the operation (or batch) JSON, and ``map`` names the variables
+        each uploaded file goes in, e.g. ``{"0": ["variables.file"]}``.
+        """
+        try:
+            operations = json.loads(request.POST["operations"])
+            file_map = json.loads(request.POST.get("map") or "{}")
+        except ValueError:
+            raise HttpError(HttpResponseBadRequest("Multipart operations and map must be JSON."))
+        for key, paths in file_map.items():
+            if key not in request.FILES:
+                raise HttpError(HttpResponseBadRequest(f"Missing file '{key}' named in the map."))
+            for path in paths:
+                *parents, name = path.split(".")
+                target = operations
+                try:
+                    for part in parents:
+                        target = target[int(part) if isinstance(target, list) else part]
+                    target[int(name) if isinstance(target, list) else name] = request.FILES[key]
+                except (KeyError, IndexError, TypeError, ValueError):
+                    raise HttpError(HttpResponseBadRequest(f"Invalid map path '{path}'."))
+        if isinstance(operations, list):
+            return self.parse_batch(operations)
+        return operations
+
+    def parse_batch(self, data):
+        if not data or not all(isinstance(entry, dict) for entry in data):
+            raise HttpError(HttpResponseBadRequest("A batch must be a non-empty list of operations."))
+        max_operations = batch_options()["MAX_OPERATIONS"]
+        if len(data) > max_operations:
+            raise HttpError(HttpResponseBadRequest(f"A batch may hold at most {max_operations} operations."))
+        self.batch = True
+        return data
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+
+        persisted = (extensions or {}).get("persistedQuery")
+        if persisted:
+            if persisted.get("version") != 1:
+                raise HttpError(HttpResponseBadRequest("Unsupported persisted query version."))
+            sha256 = persisted.get("sha256Hash")
+            if query:
+                try:
+                    persisted_queries.register(query, sha256)
+                except ValueError as e:
+                    raise HttpError(HttpResponseBadRequest(str(e)))
+            else:
+                try:
+                    query = persisted_queries.get(sha256 or "")
+                except PersistedQueryNotFound:
+                    raise HttpError(HttpResponse(), "PersistedQueryNotFound")
+
+        return query, variables, operation_name, id
+
+    def get_middleware(self, request):
+        middleware = super().get_middleware(request)
+        trace = getattr(request, "graphql_trace", None)
+        if trace is None:
+            return middleware
+        return [*(middleware or []), InstrumentationMiddleware(trace)]
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        options = instrumentation_options()
+        if not options["ENABLED"]:
+            return self.run_graphql_request(request, query, variables, operation_name, show_graphiql)
+
+        trace = request.graphql_trace = Trace()
+        with trace.capture():
+            result = self.run_graphql_request(request, query, variables, operation_name, show_graphiql)
+        if result is not None:
+            metrics.record(trace, trace.operation or "invalid")
+            if request.headers.get(options["DEBUG_HEADER"]):
+                result.extensions = {**(result.extensions or {}), "timing": trace.summary()}
+        return result
+
+    def run_graphql_request(self, request, query, variables, operation_name, show_graphiql=False):
+        # Same flow as GraphQLView.execute_graphql_request, with parse and
+        # validate served from the document cache.
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        try:
+            document, validation_errors, costs = document_cache.parse_and_validate(
+                schema, query, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS
+            )
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        operation_ast = get_operation_ast(document, operation_name)
+        trace = getattr(request, "graphql_trace", None)
+        if trace is not None and operation_ast is not None:
+            trace.operation = operation_ast.operation.value
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        result = self.execute_operation(request, schema, document, operation_ast, variables, operation_name)
+        # computed by QueryCostRule when the document was first validated
+        cost, depth = estimate_cost(schema, document, operation_name, costs)
+        result.extensions = {
+            **(result.extensions or {}),
+            "cost": {"estimated": cost, "depth": depth, "maximum": cost_options()["MAX_COST"]},
+        }
+        return result
+
+    def execute_operation(self, request, schema, document, operation_ast, variables, operation_name):
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if operation_ast is not None and operation_ast.operation == OperationType.MUTATION:
+                # the rest of the request and the client's next reads go to
+                # the primary (crm/db_routing.py)
+                mark_written(request)
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            if operation_ast is not None and operation_ast.operation == OperationType.QUERY:
+                alias = read_alias(request)
+                with reading_from(alias):
+                    return self.execute_query(schema, document, operation_name, variables, execute_options, alias)
+
+            return execute(schema, document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    def execute_query(self, schema, document, operation_name, variables, execute_options, alias=None):
+        if not response_cache.enabled:
+            return execute(schema, document, **execute_options)
+        key = response_cache.key(schema, document, operation_name, variables)
+        data = response_cache.get(key)
+        if data is not None:
+            return ExecutionResult(data=data)
+        result = execute(schema, document, **execute_options)
+        # A replica may not have caught up with a recent change yet; caching
+        # its answer would keep serving the old data under the new version.
+        if not result.errors and not (
+            alias and response_cache.changed_within(
+                response_cache.dependencies(schema, document), routing_options()["STICKY_SECONDS"]
+            )
+        ):
+            response_cache.set(key, result.data)
+        return result
+
+    def get_response(self, request, data, show_graphiql=False):
+        # GraphQLView.get_response, plus the result's extensions and atomic
+        # batch bookkeeping
+        atomic = hasattr(request, "graphql_batch_failed")
+        if atomic and request.graphql_batch_failed:
+            response = {"errors": [{"message": SKIPPED}]}
+            if self.batch:
+                response.update(id=data.get("id"), status=400)
+            return self.json_encode(request, response), 400
+
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        # the flag is per operation, not per batch
+        if hasattr(request, MUTATION_ERRORS_FLAG):
+            delattr(request, MUTATION_ERRORS_FLAG)
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if atomic and execution_result is not None and (
+            execution_result.errors
+            or getattr(request, MUTATION_ERRORS_FLAG, False) is True
+            or payload_errors(execution_result.data)
+        ):
+            request.graphql_batch_failed = True
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+
+class AsyncCRMGraphQLView(CRMGraphQLView):
+    """
+    CRMGraphQLView for ASGI servers.
+
+    Under ASGI Django runs a sync view in a thread made for that request,
+    so concurrency (and with it threads and database connections) is
+    unbounded, while anything calling views outside a request context
+    serializes them on one thread. This view is async: requests execute on
+    a bounded pool of ``GRAPHQL_ASYNC_WORKERS`` threads that keep their
+    database connections, and the event loop keeps accepting and
+    multiplexing connections meanwhile.
+    """
+
+    view_is_async = True
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "GRAPHQL_ASYNC_WORKERS", 8),
+                    thread_name_prefix="graphql",
+                )
+            return cls._executor
+
+    async def dispatch(self, request, *args, **kwargs):
+        dispatch = sync_to_async(self.dispatch_in_pool, thread_sensitive=False, executor=self.executor())
+        return await dispatch(request, *args, **kwargs)
+
+    def dispatch_in_pool(self, request, *args, **kwargs):
+        # pool threads outlive requests, so apply CONN_MAX_AGE here as
+        # request_started/finished would for a sync worker
+        close_old_connections()
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+
+def cache_stats(request):
+    """Hit/miss counters of this process's GraphQL caches, for monitoring."""
+    return JsonResponse({
+        "response_cache": response_cache.stats(),
+        "document_cache": {
+            "hits": document_cache.hits,
+            "misses": document_cache.misses,
+            "size": len(document_cache),
+        },
+    })
+
+
+def prometheus_metrics(request):
+    """GraphQL request, resolver and cache metrics of this process in Prometheus text format."""
+    document = {"hits": document_cache.hits, "misses": document_cache.misses}
+    responses = response_cache.stats()
+    text = metrics.render(extra=[
+        ("crm_graphql_cache_hits_total", "GraphQL cache hits.", "counter",
+         [({"cache": "document"}, document["hits"]), ({"cache": "response"}, responses["hits"])]),
+        ("crm_graphql_cache_misses_total", "GraphQL cache misses.", "counter",
+         [({"cache": "document"}, document["misses"]), ({"cache": "response"}, responses["misses"])]),
+    ])
+    return HttpResponse(text, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+
+@require_GET
+def export(request, kind):
+    """
+    Stream every ``kind`` row matching the filterset query parameters as CSV
+    (default) or NDJSON (``?format=ndjson``), gzipped when the client
+    accepts it.
+
+    Rows are read and written a chunk at a time (crm/exports.py), so memory
+    stays flat and the first bytes leave before the first query finishes,
+    however large the export.
+    """
+    if kind not in EXPORTS:
+        raise Http404(f"Unknown export '{kind}'")
+    params = request.GET.copy()
+    format = params.pop("format", ["csv"])[-1]
+    if format not in FORMATS:
+        return JsonResponse({"errors": {"format": [f"Must be one of {', '.join(FORMATS)}"]}}, status=400)
+    try:
+        # rows are read after the view returns, so route the queryset itself
+        queryset = export_queryset(kind, params, using=read_alias(request))
+    except ValueError as e:
+        return JsonResponse({"errors": e.args[0]}, status=400)
+
+    content = stream(kind, queryset, format)
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+    response = StreamingHttpResponse(compress_sequence(content) if gzipped else content, content_type=FORMATS[format])
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    response["Content-Disposition"] = f'attachment; filename="{kind}.{format}"'
+    return response